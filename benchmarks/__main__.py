@@ -0,0 +1,50 @@
+import argparse
+import importlib
+import sys
+
+from . import harness
+
+
+_MODULES = [
+    "bench_mocks",
+    "bench_expectations",
+    "bench_invocation",
+    "bench_sequence",
+    "bench_verify",
+    "bench_errors",
+    "bench_memory",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--output", help="file to write JSON results to, instead of stdout")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum time in seconds for each repeat")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two JSON result files")
+    args = parser.parse_args()
+
+    for module in _MODULES:
+        importlib.import_module("." + module, __package__)
+
+    if args.compare:
+        harness.main_compare(*args.compare)
+        return
+
+    benchmarks = [
+        benchmark
+        for benchmark in harness.all_benchmarks()
+        if args.filter in benchmark.name
+    ]
+    results = harness.run(benchmarks, repeat=args.repeat, min_time=args.min_time)
+
+    if args.output is None:
+        harness.write(results, sys.stdout)
+    else:
+        with open(args.output, "w") as fileobj:
+            harness.write(results, fileobj)
+
+
+if __name__ == "__main__":
+    main()
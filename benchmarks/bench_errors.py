@@ -0,0 +1,43 @@
+import funk
+from funk import allows
+
+from .harness import benchmark
+
+
+@benchmark("UnexpectedInvocationError message", params=[1, 100])
+def unexpected_invocation_error(count):
+    mock = funk.Mocks().mock(name="storage")
+    for index in range(0, count):
+        allows(mock).save("name-{0}".format(index), contents=b"contents")
+
+    def run():
+        try:
+            mock.save("other", contents=b"contents")
+        except funk.UnexpectedInvocationError as error:
+            return str(error)
+
+    return run
+
+
+def _large_payload_error(mocks):
+    mock = mocks.mock(name="storage")
+    allows(mock).save(b"\x00" * 10000000)
+    payload = b"\x01" * 10000000
+
+    def run():
+        try:
+            mock.save(payload)
+        except funk.UnexpectedInvocationError as error:
+            return str(error)
+
+    return run
+
+
+@benchmark("UnexpectedInvocationError message with large payload")
+def large_payload_error():
+    return _large_payload_error(funk.Mocks())
+
+
+@benchmark("UnexpectedInvocationError message with large payload and repr_limit")
+def large_payload_error_with_repr_limit():
+    return _large_payload_error(funk.Mocks(repr_limit=200))
@@ -0,0 +1,66 @@
+import funk
+from funk import allows, expects
+
+from .harness import benchmark
+from .bench_mocks import FileStorage
+
+
+@benchmark("expects(mock, name)")
+def expects_with_method_name():
+    mock = funk.Mocks().mock(FileStorage)
+    return lambda: expects(mock, "save")
+
+
+@benchmark("allows(mock).method(args).returns(value)")
+def allows_with_arguments():
+    mock = funk.Mocks().mock(FileStorage)
+    return lambda: allows(mock).names(token="<token>").returns(["a", "b"])
+
+
+@benchmark("ExpectationCreator")
+def expectation_creator():
+    mock = funk.Mocks().mock()
+    creator = expects(mock)
+    return lambda: creator.save
+
+
+@benchmark("allows() per row", params=[50000])
+def allows_per_row(count):
+    def run():
+        mock = funk.Mocks().mock(FileStorage)
+        for index in range(0, count):
+            allows(mock).names(index).returns(index)
+
+    return run
+
+
+@benchmark("allows().table(rows)", params=[50000])
+def allows_table(count):
+    def run():
+        mock = funk.Mocks().mock(FileStorage)
+        allows(mock).names.table(((index, ), index) for index in range(0, count))
+
+    return run
+
+
+@benchmark("expects() per value", params=[1000])
+def expects_per_value(count):
+    def run():
+        mock = funk.Mocks().mock(FileStorage)
+        for index in range(0, count):
+            expects(mock).names(None).returns(index)
+        for index in range(0, count):
+            mock.names(None)
+
+    return run
+
+
+@benchmark("expects().returns_from(values)", params=[1000])
+def expects_returns_from(count):
+    def run():
+        mock = funk.Mocks().mock(FileStorage)
+        expects(mock).names(None).returns_from(range(0, count))
+        for index in range(0, count):
+            mock.names(None)
+
+    return run
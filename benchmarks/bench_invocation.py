@@ -0,0 +1,52 @@
+import funk
+from funk import allows
+from precisely import contains_exactly, has_attrs, instance_of
+
+from .harness import benchmark
+
+
+_COUNTS = [1, 100, 10000]
+
+
+@benchmark("invoke literal expectations", params=_COUNTS)
+def invoke_literal_expectations(count):
+    mock = funk.Mocks().mock(name="storage")
+    for index in range(0, count):
+        allows(mock).names(token=index).returns(index)
+    last = count - 1
+    return lambda: mock.names(token=last)
+
+
+@benchmark("invoke matcher expectations", params=_COUNTS)
+def invoke_matcher_expectations(count):
+    mock = funk.Mocks().mock(name="storage")
+    for index in range(0, count - 1):
+        allows(mock).names(token=instance_of(bytes)).returns(index)
+    allows(mock).names(token=instance_of(int)).returns(count)
+    return lambda: mock.names(token=1)
+
+
+def _invoke_structural_matchers(mocks):
+    mock = mocks.mock(name="storage")
+    rows = [funk.data(key=index, value=str(index)) for index in range(0, 100)]
+    for index in range(0, 9):
+        allows(mock).save(contains_exactly(*[has_attrs(key=row.key) for row in rows[:-1]])).returns(index)
+    allows(mock).save(contains_exactly(*[has_attrs(key=row.key) for row in rows])).returns(9)
+    return lambda: mock.save(rows)
+
+
+@benchmark("invoke structural matchers")
+def invoke_structural_matchers():
+    return _invoke_structural_matchers(funk.Mocks())
+
+
+@benchmark("invoke structural matchers with matcher cache")
+def invoke_structural_matchers_with_matcher_cache():
+    return _invoke_structural_matchers(funk.Mocks(matcher_cache=funk.MatcherCache()))
+
+
+@benchmark("invoke expectation without arguments")
+def invoke_expectation_without_arguments():
+    mock = funk.Mocks().mock(name="storage")
+    allows(mock).names.returns([])
+    return lambda: mock.names(token=1)
@@ -0,0 +1,47 @@
+import funk
+from funk import allows, expects
+
+from .harness import memory_benchmark
+
+
+@memory_benchmark("memory per expects().with_args()", params=[10000])
+def memory_per_expectation(count):
+    def run():
+        mocks = funk.Mocks()
+        storage = mocks.mock(name="storage")
+        for index in range(0, count):
+            expects(storage).save(index)
+        return mocks, count
+
+    return run
+
+
+@memory_benchmark("memory per allows()", params=[10000])
+def memory_per_allows(count):
+    def run():
+        mocks = funk.Mocks()
+        storage = mocks.mock(name="storage")
+        for index in range(0, count):
+            allows(storage).save
+        return mocks, count
+
+    return run
+
+
+@memory_benchmark("memory per mock", params=[10000])
+def memory_per_mock(count):
+    def run():
+        mocks = funk.Mocks()
+        for index in range(0, count):
+            allows(mocks.mock(name="storage")).save
+        return mocks, count
+
+    return run
+
+
+@memory_benchmark("memory per data()", params=[10000])
+def memory_per_data(count):
+    def run():
+        return [funk.data(next_token=None, names=[]) for index in range(0, count)], count
+
+    return run
@@ -0,0 +1,62 @@
+import funk
+from funk import expects
+
+from .harness import benchmark
+
+
+class FileStorage(object):
+    def names(self, token):
+        pass
+
+    def save(self, name, contents):
+        pass
+
+
+@benchmark("mocks.mock")
+def mock_without_base():
+    mocks = funk.Mocks()
+    return lambda: mocks.mock(name="file_storage")
+
+
+@benchmark("mocks.mock(base)")
+def mock_with_base():
+    mocks = funk.Mocks()
+    return lambda: mocks.mock(FileStorage)
+
+
+@benchmark("mock attribute access")
+def mock_attribute_access():
+    mocks = funk.Mocks()
+    file_storage = mocks.mock(FileStorage)
+    return lambda: file_storage.names
+
+
+@benchmark("data()")
+def data():
+    return lambda: funk.data(next_token=None, names=[])
+
+
+def _set_up_example(mocks):
+    file_storage = mocks.mock(FileStorage)
+    ordering = mocks.sequence()
+    expects(file_storage).names(None).in_sequence(ordering)
+    expects(file_storage).save("a", "b").in_sequence(ordering)
+    file_storage.names(None)
+    file_storage.save("a", "b")
+    mocks.verify()
+
+
+@benchmark("example with new Mocks")
+def example_with_new_mocks():
+    return lambda: _set_up_example(funk.Mocks())
+
+
+@benchmark("example with pooled Mocks")
+def example_with_pooled_mocks():
+    mocks = funk.Mocks(pooled=True)
+
+    def run():
+        mocks.reset()
+        _set_up_example(mocks)
+
+    return run
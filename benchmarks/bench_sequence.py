@@ -0,0 +1,18 @@
+import funk
+from funk import expects
+
+from .harness import benchmark
+
+
+@benchmark("sequence of expectations", params=[10, 1000])
+def sequence_of_expectations(count):
+    def run():
+        mocks = funk.Mocks()
+        log = mocks.mock(name="log")
+        ordering = mocks.sequence()
+        for index in range(0, count):
+            expects(log).write(index).in_sequence(ordering)
+        for index in range(0, count):
+            log.write(index)
+
+    return run
@@ -0,0 +1,16 @@
+import funk
+from funk import allows, expects
+
+from .harness import benchmark
+
+
+@benchmark("mocks.verify", params=[10, 1000])
+def verify(count):
+    mocks = funk.Mocks()
+    for index in range(0, count):
+        mock = mocks.mock(name="mock_{0}".format(index))
+        expects(mock).save(index)
+        allows(mock).load(index)
+        mock.save(index)
+
+    return mocks.verify
@@ -0,0 +1,168 @@
+import json
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+
+_benchmarks = []
+
+
+def benchmark(name, params=(None, )):
+    """
+    Registers a benchmark. The decorated function is called once per
+    parameter to set up the benchmark, and should return a function that
+    performs the operation being timed.
+    """
+    def register(setup):
+        _benchmarks.append(Benchmark(name, setup, params))
+        return setup
+
+    return register
+
+
+def memory_benchmark(name, params=(None, )):
+    """
+    Registers a memory benchmark. The decorated function is called once per
+    parameter, and should return a function that creates objects and
+    returns them along with the number of operations they represent.
+    The objects are kept alive while memory is measured.
+    """
+    def register(setup):
+        _benchmarks.append(MemoryBenchmark(name, setup, params))
+        return setup
+
+    return register
+
+
+def all_benchmarks():
+    return list(_benchmarks)
+
+
+class Benchmark(object):
+    def __init__(self, name, setup, params):
+        self.name = name
+        self._setup = setup
+        self._params = params
+
+    def run(self, repeat, min_time):
+        for param in self._params:
+            if param is None:
+                operation = self._setup()
+            else:
+                operation = self._setup(param)
+            timer = timeit.Timer(operation)
+            number = _number_for(timer, min_time)
+            timings = timer.repeat(repeat=repeat, number=number)
+            yield {
+                "name": self.name,
+                "param": param,
+                "number": number,
+                "repeat": repeat,
+                "seconds_per_op": min(timings) / number,
+            }
+
+
+class MemoryBenchmark(object):
+    def __init__(self, name, setup, params):
+        self.name = name
+        self._setup = setup
+        self._params = params
+
+    def run(self, repeat, min_time):
+        for param in self._params:
+            if param is None:
+                operation = self._setup()
+            else:
+                operation = self._setup(param)
+            tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]
+                objects, number = operation()
+                after = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            del objects
+            yield {
+                "name": self.name,
+                "param": param,
+                "number": number,
+                "bytes_per_op": (after - before) / number,
+            }
+
+
+def _number_for(timer, min_time):
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            return number
+        number *= 10
+
+
+def run(benchmarks, repeat, min_time):
+    return {
+        "commit": _current_commit(),
+        "python": {
+            "implementation": platform.python_implementation(),
+            "version": platform.python_version(),
+        },
+        "results": [
+            result
+            for benchmark in benchmarks
+            for result in benchmark.run(repeat=repeat, min_time=min_time)
+        ],
+    }
+
+
+def compare(old, new):
+    """
+    Yields (name, param, unit, old value, new value) for each benchmark
+    present in both result sets.
+    """
+    old_results = dict(
+        ((result["name"], result["param"]), result)
+        for result in old["results"]
+    )
+    for result in new["results"]:
+        key = (result["name"], result["param"])
+        if key in old_results:
+            unit = _unit(result)
+            yield key[0], key[1], unit, old_results[key][unit], result[unit]
+
+
+def _unit(result):
+    if "bytes_per_op" in result:
+        return "bytes_per_op"
+    else:
+        return "seconds_per_op"
+
+
+def write(results, fileobj):
+    json.dump(results, fileobj, indent=2, sort_keys=True)
+    fileobj.write("\n")
+
+
+def _current_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            stderr=subprocess.DEVNULL,
+        ).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main_compare(old_path, new_path):
+    with open(old_path) as fileobj:
+        old = json.load(fileobj)
+    with open(new_path) as fileobj:
+        new = json.load(fileobj)
+
+    for name, param, unit, old_value, new_value in compare(old, new):
+        label = name if param is None else "{0}[{1}]".format(name, param)
+        if unit == "bytes_per_op":
+            values = "{0:>12.1f}B  {1:>12.1f}B ".format(old_value, new_value)
+        else:
+            values = "{0:>12.3f}us {1:>12.3f}us".format(old_value * 1e6, new_value * 1e6)
+        sys.stdout.write("{0:<50} {1} {2:>8.2f}x\n".format(label, values, new_value / old_value))
@@ -1,42 +1,97 @@
-from functools import wraps
-import inspect
+import sys
+from time import perf_counter
 
 from funk.error import FunkyError
 from funk.call import Call
 from funk.call import IntegerCallCount
 from funk.call import InfiniteCallCount
+from funk.call import LockedCallCount
+from funk.call import Mismatch
+from funk.call import ReturnValue
+from funk.dispatch import CallIndex
+from funk.matchers import MatcherCache
+from funk.spec import spec_for
+from funk.stats import Stats
+from funk.recording import Recording
 from funk.sequence import Sequence
-from funk.util import function_call_str
-from .tools import data
+from funk.shared import SharedCounters, SharedSequence
+from funk.util import bounded_repr, function_call_str
+from .tools import data, data_view
 
 
-__all__ = ['with_mocks', 'Mocks', 'expects', 'allows', 'expects_call', 'allows_call', 'data']
+__all__ = ['with_mocks', 'Mocks', 'expects', 'allows', 'expects_call', 'allows_call', 'data', 'data_view', 'template', 'Recording', 'MatcherCache', 'invocations']
 
 class UnexpectedInvocationError(AssertionError):
-    def __init__(self, mock_name, args, kwargs, expectations):
-        args_str = map(repr, args)
+    """
+    Raised when a mock is invoked with arguments that no expectation accepts.
+    The message is only built when the error is converted to a string, so
+    errors that are caught and discarded cost little. As for other
+    exceptions, args holds the message. If repr_limit is given,
+    the repr of each argument and the description of each matcher in the
+    message is truncated to that many characters.
+    """
+
+    def __init__(self, mock_name, args, kwargs, expectations, repr_limit=None):
+        super(UnexpectedInvocationError, self).__init__()
+        self._mock_name = mock_name
+        self._invocation = (args, kwargs)
+        self._expectations = expectations
+        self._repr_limit = repr_limit
+        self._message = None
+
+    def __str__(self):
+        if self._message is None:
+            self._message = self._describe()
+        return self._message
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, str(self))
+
+    @property
+    def args(self):
+        return (str(self), )
+
+    @args.setter
+    def args(self, args):
+        self._message = args[0] if len(args) == 1 else str(args)
+
+    def _describe(self):
+        mock_name = self._mock_name
+        repr_limit = self._repr_limit
+        args, kwargs = self._invocation
+        args_str = [bounded_repr(value, repr_limit) for value in args]
         kwargs_str = {}
         for key, value in kwargs.items():
-            kwargs_str[key] = repr(value)
+            kwargs_str[key] = bounded_repr(value, repr_limit)
         call_str = function_call_str(mock_name, args_str, kwargs_str)
         exception_str = ["Unexpected invocation: %s" % call_str]
         exception_str.append("\nThe following expectations on %s did not match:\n    " % mock_name)
-        if len(expectations) > 0:
-            exception_str.append("\n    ".join(e.replace("\n", "\n    ") for e in expectations))
+        if len(self._expectations) > 0:
+            exception_str.append("\n    ".join(
+                _describe_expectation(e, repr_limit).replace("\n", "\n    ")
+                for e in self._expectations
+            ))
         else:
             exception_str.append("No expectations set.")
-        super(UnexpectedInvocationError, self).__init__(''.join(exception_str))
+        return ''.join(exception_str)
+
+def _describe_expectation(expectation, repr_limit):
+    if isinstance(expectation, Mismatch):
+        return expectation.describe(repr_limit)
+    else:
+        return str(expectation)
 
 class Mock(object):
-    def __init__(self, base, name):
-        self._mocked_calls = MockedCalls(base, name)
+    def __init__(self, base, name, mocks=None):
+        mocked_calls = self._mocked_calls = MockedCalls(base, name, mocks)
         self._base = base
+        self._spec = mocked_calls._spec
 
     def __getattribute__(self, name):
         my = lambda name: object.__getattribute__(self, name)
         mocked_calls = my('_mocked_calls')
-        base = my('_base')
-        if name in mocked_calls or (base is not None and hasattr(base, name)):
+        spec = my('_spec')
+        if name in mocked_calls or (spec is not None and spec.has_attribute(name)):
             return mocked_calls.for_method(name)
         return my(name)
 
@@ -46,37 +101,196 @@ class Mock(object):
     def _verify(self):
         object.__getattribute__(self, "_mocked_calls").verify()
 
-class MockedCalls(object):
-    def __init__(self, base, mock_name):
+    def _recycle(self, base, name, mocks):
+        mocked_calls = object.__getattribute__(self, "_mocked_calls")
+        mocked_calls.recycle(base, name, mocks)
+        # Attributes set on the mock by the code under test must not be seen
+        # by whoever is given the mock next
+        attributes = object.__getattribute__(self, "__dict__")
+        for attribute in list(attributes):
+            if attribute not in _MOCK_ATTRIBUTES:
+                del attributes[attribute]
         self._base = base
+        self._spec = mocked_calls._spec
+
+_MOCK_ATTRIBUTES = frozenset(["_mocked_calls", "_base", "_spec"])
+
+class MockedCalls(object):
+    __slots__ = (
+        "_base",
+        "_spec",
+        "_method_calls",
+        "_function_calls",
+        "_mock_name",
+        "_stats",
+        "_lock",
+        "_shared_counters",
+        "_dispatchers",
+        "_spare_indexes",
+        "_invocations",
+        "_unsatisfied",
+        "_matcher_cache",
+        "_repr_limit",
+    )
+
+    def __init__(self, base, mock_name, mocks=None):
         self._method_calls = {}
-        self._function_calls = []
-        self._mock_name = mock_name
+        self._dispatchers = {}
+        self._spare_indexes = None
+        self._configure(base, mock_name, mocks)
+
+    def recycle(self, base, mock_name, mocks=None):
+        """
+        Removes all calls, and sets up these mocked calls for a new mock,
+        reusing the existing dictionaries and indexes.
+        """
+        if self._spare_indexes is None:
+            self._spare_indexes = []
+        for index in self._method_calls.values():
+            index.clear()
+            self._spare_indexes.append(index)
+        if self._function_calls is not _NO_CALLS:
+            self._function_calls.clear()
+            self._spare_indexes.append(self._function_calls)
+        self._method_calls.clear()
+        self._dispatchers.clear()
+        self._configure(base, mock_name, mocks)
+
+    def _configure(self, base, mock_name, mocks):
+        self._base = base
+        self._spec = None if base is None else spec_for(base)
+        # Most mocks are never called directly, so the index for calls on
+        # the mock itself is only created when the first one is added
+        self._function_calls = _NO_CALLS
+        # Names may be any value, but only strings can be interned
+        self._mock_name = sys.intern(mock_name) if type(mock_name) is str else mock_name
+        self._stats = None if mocks is None else mocks.stats
+        if mocks is not None and mocks._thread_safe:
+            import threading
+            self._lock = threading.Lock()
+        else:
+            self._lock = None
+        self._shared_counters = None if mocks is None else mocks._shared_counters
+        # Calls that might not be satisfied, shared by all mocks of the same
+        # Mocks so that it can be verified without checking every call
+        self._unsatisfied = {} if mocks is None else mocks._unsatisfied
+        self._matcher_cache = None if mocks is None else mocks._matcher_cache
+        self._repr_limit = None if mocks is None else mocks._repr_limit
+        if mocks is not None and mocks._recording is not None:
+            self._invocations = mocks._recording.buffer()
+        else:
+            self._invocations = None
 
     def add_method_call(self, method_name, call_count):
-        if self._base is not None:
-            if not hasattr(self._base, method_name):
+        if self._spec is not None:
+            if not self._spec.has_attribute(method_name):
                 raise AssertionError("Method '%s' is not defined on type object '%s'" % (method_name, self._base.__name__))
-            if not callable(getattr(self._base, method_name)):
+            if not self._spec.is_callable(method_name):
                 raise AssertionError("Attribute '%s' is not callable on type object '%s'" % (method_name, self._base.__name__))
-        call = Call("%s.%s" % (self._mock_name, method_name), call_count)
+        call = Call(self._method_name(method_name), self._synchronise(call_count))
+        if self._spec is not None and self._spec.is_coroutine_function(method_name):
+            call._make_asynchronous()
 
-        if method_name not in self._method_calls:
-            self._method_calls[method_name] = []
+        self._calls_for_method(method_name).append(self._track(call))
+        return call
 
-        self._method_calls[method_name].append(call)
+    def _track(self, call):
+        call._unsatisfied = self._unsatisfied
+        call._matcher_cache = self._matcher_cache
+        call._mocked_calls = self
+        if not call.is_satisfied():
+            self._unsatisfied[call] = None
         return call
 
+    def _calls_for_method(self, method_name):
+        if method_name not in self._method_calls:
+            self._method_calls[sys.intern(method_name)] = self._new_index()
+
+        return self._method_calls[method_name]
+
+    def _method_name(self, method_name):
+        return sys.intern("%s.%s" % (self._mock_name, method_name))
+
     def add_function_call(self, call_count):
-        call = Call(self._mock_name, call_count)
-        self._function_calls.append(call)
+        call = Call(self._mock_name, self._synchronise(call_count))
+        self._calls_for_self().append(self._track(call))
         return call
 
+    def _calls_for_self(self):
+        if self._function_calls is _NO_CALLS:
+            self._function_calls = self._new_index()
+
+        return self._function_calls
+
+    def _new_index(self):
+        if self._spare_indexes:
+            return self._spare_indexes.pop()
+        else:
+            return CallIndex()
+
+    def _synchronise(self, call_count):
+        # Shared call counts are already updated under a process-shared lock.
+        # Infinite call counts have no state to protect, so calls allowed
+        # any number of times never wait for the lock.
+        if self._shared_counters is not None:
+            return self._shared_counters.share(call_count)
+        elif self._lock is None or isinstance(call_count, InfiniteCallCount):
+            return call_count
+        else:
+            return LockedCallCount(call_count, self._lock)
+
     def for_method(self, name):
-        return MockedCallsForFunction("%s.%s" % (self._mock_name, name), self._method_calls.get(name, []))
+        dispatcher = self._dispatchers.get(name)
+        if dispatcher is None:
+            calls = self._method_calls.get(name, _NO_CALLS)
+            dispatcher = self._dispatcher(self._method_name(name), calls, name)
+            # Dispatchers for methods without expectations are not cached,
+            # since an index is created for the method when one is added
+            if calls is not _NO_CALLS:
+                self._dispatchers[name] = dispatcher
+        return dispatcher
 
     def for_self(self):
-        return MockedCallsForFunction(self._mock_name, self._function_calls)
+        dispatcher = self._dispatchers.get(None)
+        if dispatcher is None:
+            dispatcher = self._dispatcher(self._mock_name, self._function_calls, None)
+            if self._function_calls is not _NO_CALLS:
+                self._dispatchers[None] = dispatcher
+        return dispatcher
+
+    def _dispatcher(self, name, calls, method_name):
+        if self._stats is None:
+            dispatcher = MockedCallsForFunction(name, calls, self._repr_limit)
+        else:
+            method_stats = self._stats.for_method(self._mock_name, method_name)
+            dispatcher = StatsMockedCallsForFunction(name, calls, self._repr_limit, method_stats)
+        if self._invocations is None:
+            return dispatcher
+        else:
+            return RecordingMockedCallsForFunction(dispatcher, self._invocations)
+
+    def invocations(self):
+        if self._invocations is None:
+            raise FunkyError("Invocations are not being recorded: create Mocks with recording=funk.Recording()")
+        return self._invocations.invocations()
+
+    def copy_calls_from(self, other, copies):
+        """
+        Adds copies of the calls on other to these mocked calls, recording
+        each copy in copies keyed by the original call. The copies do not
+        belong to any sequences.
+        """
+        def copy_call(call):
+            copy = call._copy(self._synchronise(call._call_count.copy()))
+            copies[call] = copy
+            return self._track(copy)
+
+        for method_name in other._method_calls:
+            calls = self._calls_for_method(method_name)
+            for call in other._method_calls[method_name]:
+                calls.append(copy_call(call))
+        for call in other._function_calls:
+            self._calls_for_self().append(copy_call(call))
 
     def __contains__(self, name):
         return name in self._method_calls
@@ -90,22 +304,71 @@ class MockedCalls(object):
 
     def _verify_call(self, call):
         if not call.is_satisfied():
-            raise AssertionError("Not all expectations were satisfied. Expected call: %s" % call)
+            raise AssertionError("Not all expectations were satisfied. Expected call: %s" % call.describe(self._repr_limit))
+        if call.has_unawaited_results():
+            raise AssertionError("Not all awaitables were awaited. Awaitable returned by call: %s" % call.describe(self._repr_limit))
+
+_NO_CALLS = CallIndex()
 
 class MockedCallsForFunction(object):
-    def __init__(self, name, calls):
+    __slots__ = ("_name", "_calls", "_repr_limit")
+
+    def __init__(self, name, calls, repr_limit=None):
         self._name = name
         self._calls = calls
+        self._repr_limit = repr_limit
 
     def __call__(self, *args, **kwargs):
-        desc = []
-        for call in self._calls:
-            if call.accepts(args, kwargs, desc):
-                return call(*args, **kwargs)
+        for call in self._calls.candidates(args, kwargs):
+            if call.match(args, kwargs) is None and call._call_count.claim():
+                return call._invoke(args, kwargs)
+
+        mismatches = [call.match(args, kwargs) for call in self._calls]
+        raise UnexpectedInvocationError(self._name, args, kwargs, mismatches, self._repr_limit)
 
-        raise UnexpectedInvocationError(self._name, args, kwargs, desc)
+class StatsMockedCallsForFunction(MockedCallsForFunction):
+    __slots__ = ("_method_stats", )
+
+    def __init__(self, name, calls, repr_limit, method_stats):
+        super(StatsMockedCallsForFunction, self).__init__(name, calls, repr_limit)
+        self._method_stats = method_stats
+
+    def __call__(self, *args, **kwargs):
+        method_stats = self._method_stats
+        candidates = self._calls.candidates(args, kwargs)
+        for scanned, call in enumerate(candidates, 1):
+            start = perf_counter()
+            mismatch = call.match(args, kwargs)
+            method_stats.matcher_time += perf_counter() - start
+            if mismatch is None and call._call_count.claim():
+                method_stats.record_dispatch(scanned)
+                start = perf_counter()
+                try:
+                    return call._invoke(args, kwargs)
+                finally:
+                    method_stats.action_time += perf_counter() - start
+
+        method_stats.record_dispatch(len(candidates))
+        method_stats.unexpected_invocations += 1
+        mismatches = [call.match(args, kwargs) for call in self._calls]
+        method_stats.mismatch_descriptions += len(mismatches)
+        raise UnexpectedInvocationError(self._name, args, kwargs, mismatches, self._repr_limit)
+
+class RecordingMockedCallsForFunction(object):
+    __slots__ = ("_dispatcher", "_invocations")
+
+    def __init__(self, dispatcher, invocations):
+        self._dispatcher = dispatcher
+        self._invocations = invocations
+
+    def __call__(self, *args, **kwargs):
+        self._invocations.record(self._dispatcher._name, args, kwargs)
+        return self._dispatcher(*args, **kwargs)
 
 def with_mocks(test_function, mock_factory=None):
+    from functools import wraps
+    import inspect
+
     @wraps(test_function)
     def test_function_with_mocks(*args, **kwargs):
         if 'mocks' in kwargs:
@@ -160,33 +423,187 @@ def expects_call(mock):
 def allows_call(mock):
     return MethodArgumentsSetter(object.__getattribute__(mock, "_mocked_calls").add_function_call(InfiniteCallCount()))
 
+def invocations(mock):
+    """
+    Returns the recorded invocations of mock, oldest first, when its Mocks
+    was created with a Recording.
+    """
+    return object.__getattribute__(mock, "_mocked_calls").invocations()
+
+def template(setup):
+    """
+    Creates a template from a function that sets up mocks and expectations.
+    See Template.
+    """
+    return Template(setup)
+
+class Template(object):
+    """
+    A set of mocks and expectations that is set up once, and then copied
+    each time the template is used.
+
+    The setup function is called with a Mocks the first time the template is
+    used, and may return mocks created from that Mocks, either directly or
+    inside tuples, lists and dicts. Calling the template with a Mocks adds
+    copies of the template's mocks to that Mocks, and returns the setup
+    function's return value with mocks replaced by their copies.
+
+    Each copy has its own call counts and sequences, but shares arguments
+    and actions with the template. Return values set by returns() that are
+    mocks from the template are also replaced by their copies.
+    """
+
+    def __init__(self, setup):
+        self._setup = setup
+        self._mocks = None
+        self._result = None
+
+    def __call__(self, mocks):
+        if self._mocks is None:
+            template_mocks = Mocks()
+            self._result = self._setup(template_mocks)
+            self._mocks = template_mocks
+
+        mock_copies = {}
+        call_copies = {}
+        for mock in self._mocks._mocks:
+            mocked_calls = object.__getattribute__(mock, "_mocked_calls")
+            mock_copy = mocks.mock(mocked_calls._base, mocked_calls._mock_name)
+            object.__getattribute__(mock_copy, "_mocked_calls").copy_calls_from(mocked_calls, call_copies)
+            mock_copies[mock] = mock_copy
+
+        sequence_copies = {}
+        for call, call_copy in call_copies.items():
+            for sequence in call._sequences:
+                if sequence not in sequence_copies:
+                    sequence_copy = sequence_copies[sequence] = mocks.sequence()
+                    for expected_call in sequence._expected_calls:
+                        sequence_copy.add_expected_call(call_copies[expected_call])
+                call_copy._sequences += (sequence_copies[sequence], )
+
+            if isinstance(call._action, ReturnValue) and isinstance(call._action.value, Mock):
+                call_copy._action = ReturnValue(mock_copies.get(call._action.value, call._action.value))
+
+        return _replace_mocks(self._result, mock_copies)
+
+def _is_verified(call):
+    return call.is_satisfied() and not call.has_unawaited_results()
+
+def _replace_mocks(value, mock_copies):
+    if isinstance(value, Mock):
+        return mock_copies.get(value, value)
+    elif isinstance(value, tuple):
+        return tuple(_replace_mocks(element, mock_copies) for element in value)
+    elif isinstance(value, list):
+        return [_replace_mocks(element, mock_copies) for element in value]
+    elif isinstance(value, dict):
+        return dict(
+            (key, _replace_mocks(element, mock_copies))
+            for key, element in value.items()
+        )
+    else:
+        return value
+
 class Mocks(object):
-    def __init__(self, mock_factory=None):
-        if mock_factory is None:
-            mock_factory = Mock
+    def __init__(self, mock_factory=None, stats=False, thread_safe=False, fork_safe=False, pooled=False, recording=None, matcher_cache=None, repr_limit=None):
+        if repr_limit is not None and repr_limit < 1:
+            raise ValueError("repr_limit must be at least 1")
         self._mocks = []
+        self._unsatisfied = {}
+        self._recording = recording
+        self._matcher_cache = matcher_cache
+        self._repr_limit = repr_limit
+        if pooled:
+            # Mocks and sequences from before the last reset, ready to be
+            # reused, and the sequences created since then
+            self._mock_pool = []
+            self._sequence_pool = []
+            self._sequences = []
+        else:
+            self._mock_pool = None
         self._mock_factory = mock_factory
+        self.stats = Stats() if stats else None
+        self._thread_safe = thread_safe
+        if fork_safe:
+            self._shared_counters = SharedCounters()
+        else:
+            self._shared_counters = None
 
-        for attr in ["allows", "expects", "data"]:
+        for attr in ["allows", "expects", "data", "data_view"]:
             setattr(self, attr, globals()[attr])
 
     def mock(self, base=None, name=None):
-        mock = self._mock_factory(base, self._generate_name(name, base))
+        name = self._generate_name(name, base)
+        if self._mock_factory is None:
+            if self._mock_pool:
+                mock = self._mock_pool.pop()
+                Mock._recycle(mock, base, name, self)
+            else:
+                mock = Mock(base, name, self)
+        else:
+            mock = self._mock_factory(base, name)
         self._mocks.append(mock)
         return mock
 
     def verify(self):
+        # Calls are removed from _unsatisfied once they have been satisfied,
+        # so if the calls that remain are now satisfied (such as by another
+        # process), so are all the others. Otherwise, every call is checked
+        # in order to find the first that is not satisfied.
+        if self._mock_factory is None and all(map(_is_verified, list(self._unsatisfied))):
+            return
         for mock in self._mocks:
             mock._verify()
 
+    def reset(self):
+        """
+        Forgets all mocks and sequences created by this Mocks, so that it can
+        be used as if newly created. If the Mocks is pooled, mocks and
+        sequences created before the reset are reused by later calls to
+        mock() and sequence(), so must no longer be used.
+        """
+        if self._mock_pool is not None:
+            self._mock_pool.extend(mock for mock in self._mocks if type(mock) is Mock)
+            for sequence in self._sequences:
+                sequence._reset()
+            self._sequence_pool.extend(self._sequences)
+            del self._sequences[:]
+        del self._mocks[:]
+        self._unsatisfied.clear()
+        if self._matcher_cache is not None:
+            self._matcher_cache.clear()
+
     def sequence(self):
-        return Sequence()
+        if self._mock_pool is None:
+            return self._create_sequence()
+
+        if self._sequence_pool:
+            sequence = self._sequence_pool.pop()
+        else:
+            sequence = self._create_sequence()
+        self._sequences.append(sequence)
+        return sequence
+
+    def _create_sequence(self):
+        if self._shared_counters is not None:
+            return SharedSequence(self._shared_counters)
+        elif self._thread_safe:
+            import threading
+            return Sequence(threading.Lock())
+        else:
+            return Sequence()
 
     def _generate_name(self, name, base):
         if name is not None:
             return name
         if base is None:
             return "unnamed"
+        spec = spec_for(base)
+        if spec.mock_name is None:
+            spec.mock_name = self._name_for_type(base)
+        return spec.mock_name
+
+    def _name_for_type(self, base):
         name = []
         name.append(base.__name__[0].lower())
         for character in base.__name__[1:]:
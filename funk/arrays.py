@@ -0,0 +1,105 @@
+"""
+Matchers for NumPy arrays and other array-like values. NumPy is only
+imported when an array is matched, and is not needed to import funk.
+"""
+
+from precisely import Matcher
+from precisely.results import matched, unmatched
+
+
+def _as_array(value):
+    # Only values that are already arrays, or that can be viewed as one
+    # without going through Python objects, are matched
+    import numpy
+    if isinstance(value, numpy.ndarray):
+        return value
+    value_type = type(value)
+    if isinstance(value, memoryview) or hasattr(value_type, "__array__") or hasattr(value_type, "__array_interface__"):
+        return numpy.asarray(value)
+    return None
+
+
+def _shape_str(shape):
+    return str(tuple(shape))
+
+
+class _ArrayComparisonMatcher(Matcher):
+    def __init__(self, expected):
+        self._expected = expected
+
+    def match(self, actual):
+        import numpy
+        expected = numpy.asarray(self._expected)
+        actual_array = _as_array(actual)
+        if actual_array is None:
+            return unmatched("was %r" % (actual, ))
+        if actual_array.shape != expected.shape:
+            return unmatched("had shape %s" % (_shape_str(actual_array.shape), ))
+
+        try:
+            equal = self._elements_equal(numpy, expected, actual_array)
+        except TypeError:
+            return unmatched("could not be compared: was %r" % (actual_array, ))
+        if not isinstance(equal, numpy.ndarray) or equal.shape != expected.shape:
+            # Arrays that numpy cannot compare elementwise are never equal
+            return matched() if bool(equal) else unmatched("was %r" % (actual_array, ))
+        if equal.all():
+            return matched()
+
+        index = tuple(int(position) for position in numpy.argwhere(~equal)[0])
+        return unmatched("was %r at index %s, expected %r" % (
+            actual_array[index].tolist(),
+            index,
+            expected[index].tolist(),
+        ))
+
+
+class ArrayEqualToMatcher(_ArrayComparisonMatcher):
+    def _elements_equal(self, numpy, expected, actual):
+        return expected == actual
+
+    def describe(self):
+        return "array equal to %r" % (self._expected, )
+
+
+class ArrayCloseToMatcher(_ArrayComparisonMatcher):
+    def __init__(self, expected, rtol, atol, equal_nan):
+        super(ArrayCloseToMatcher, self).__init__(expected)
+        self._rtol = rtol
+        self._atol = atol
+        self._equal_nan = equal_nan
+
+    def _elements_equal(self, numpy, expected, actual):
+        return numpy.isclose(actual, expected, rtol=self._rtol, atol=self._atol, equal_nan=self._equal_nan)
+
+    def describe(self):
+        return "array close to %r (rtol=%r, atol=%r)" % (self._expected, self._rtol, self._atol)
+
+
+class ArrayWithMatcher(Matcher):
+    def __init__(self, shape, dtype):
+        self._shape = None if shape is None else tuple(shape)
+        self._dtype = dtype
+
+    def match(self, actual):
+        import numpy
+        actual_array = _as_array(actual)
+        if actual_array is None:
+            return unmatched("was %r" % (actual, ))
+        if self._shape is not None and actual_array.shape != self._shape:
+            return unmatched("had shape %s" % (_shape_str(actual_array.shape), ))
+        if self._dtype is not None and actual_array.dtype != numpy.dtype(self._dtype):
+            return unmatched("had dtype %s" % (actual_array.dtype, ))
+        return matched()
+
+    def describe(self):
+        descriptions = []
+        if self._shape is not None:
+            descriptions.append("shape %s" % (_shape_str(self._shape), ))
+        if self._dtype is not None:
+            import numpy
+            descriptions.append("dtype %s" % (numpy.dtype(self._dtype), ))
+        if descriptions:
+            return "array with %s" % " and ".join(descriptions)
+        else:
+            return "array"
@@ -1,20 +1,45 @@
+from collections import deque
+from collections.abc import Coroutine
+from operator import eq
+
 from funk.error import FunkyError
 from funk.util import function_call_str
 from funk.util import function_call_str_multiple_lines
-from funk.matchers import to_matcher
+from funk.util import bounded_repr, truncate
+from funk.matchers import is_array, is_matcher, to_matcher
 from .util import map_values
 
+_NO_KEYWORDS = frozenset()
+
 class InfiniteCallCount(object):
+    __slots__ = ()
+
+    # Infinite call counts have no state, so a single instance is shared
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(InfiniteCallCount, cls).__new__(cls)
+        return cls._instance
+
     def none_remaining(self):
         return False
 
     def decrement(self):
         pass
 
+    def claim(self):
+        return True
+
+    def copy(self):
+        return self
+
     def is_satisfied(self):
         return True
 
 class IntegerCallCount(object):
+    __slots__ = ("_count", )
+
     def __init__(self, count):
         self._count = count
 
@@ -24,116 +49,634 @@ class IntegerCallCount(object):
     def decrement(self):
         self._count -= 1
 
+    def claim(self):
+        if self._count <= 0:
+            return False
+        self._count -= 1
+        return True
+
+    def copy(self):
+        return IntegerCallCount(self._count)
+
     def is_satisfied(self):
         return self.none_remaining()
 
+class LockedCallCount(object):
+    """
+    Wraps a call count so that claiming a call is atomic across threads.
+    """
+
+    __slots__ = ("_call_count", "_lock")
+
+    def __init__(self, call_count, lock):
+        self._call_count = call_count
+        self._lock = lock
+
+    def none_remaining(self):
+        return self._call_count.none_remaining()
+
+    def decrement(self):
+        with self._lock:
+            self._call_count.decrement()
+
+    def claim(self):
+        with self._lock:
+            return self._call_count.claim()
+
+    def is_satisfied(self):
+        return self._call_count.is_satisfied()
+
+_NOT_FETCHED = object()
+_EXHAUSTED = object()
+
+class ValueStream(object):
+    """
+    Values taken lazily from an iterator. A value is claimed by an
+    invocation before it is returned, so that invocations are only accepted
+    while the iterator has values left.
+    """
+
+    __slots__ = ("_iterator", "_next", "_claimed")
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self._next = _NOT_FETCHED
+        self._claimed = deque()
+
+    def is_known_exhausted(self):
+        return self._next is _EXHAUSTED
+
+    def is_exhausted(self):
+        self._fetch()
+        return self._next is _EXHAUSTED
+
+    def claim(self):
+        self._fetch()
+        if self._next is _EXHAUSTED:
+            return False
+        self._claimed.append(self._next)
+        self._next = _NOT_FETCHED
+        return True
+
+    def take(self):
+        return self._claimed.popleft()
+
+    def _fetch(self):
+        if self._next is _NOT_FETCHED:
+            self._next = next(self._iterator, _EXHAUSTED)
+
+class StreamCallCount(object):
+    """
+    Allows one call for each value in a stream, up to an optional maximum
+    count. If required, the call is only satisfied once there are no calls
+    remaining.
+    """
+
+    __slots__ = ("_stream", "_count", "_required")
+
+    def __init__(self, stream, count, required):
+        self._stream = stream
+        self._count = count
+        self._required = required
+
+    def none_remaining(self):
+        # The stream is only advanced when claiming a call, so that checking
+        # for remaining calls never has to wait for the iterator
+        return self._count == 0 or self._stream.is_known_exhausted()
+
+    def decrement(self):
+        self.claim()
+
+    def claim(self):
+        if self._count == 0 or not self._stream.claim():
+            return False
+        if self._count is not None:
+            self._count -= 1
+        return True
+
+    def copy(self):
+        raise FunkyError("Cannot copy calls that return values from an iterable")
+
+    def is_satisfied(self):
+        return not self._required or self._count == 0 or self._stream.is_exhausted()
+
+class Mismatch(object):
+    ALREADY_SATISFIED = "already-satisfied"
+    WRONG_NUMBER_OF_POSITIONAL_ARGUMENTS = "wrong-number-of-positional-arguments"
+    MISSING_KEYWORD_ARGUMENTS = "missing-keyword-arguments"
+    UNEXPECTED_KEYWORD_ARGUMENTS = "unexpected-keyword-arguments"
+    ARGUMENTS = "arguments"
+    NO_TABLE_ROW = "no table row"
+
+    __slots__ = ("call", "reason", "details")
+
+    def __init__(self, call, reason, details=None):
+        self.call = call
+        self.reason = reason
+        self.details = details
+
+    def describe(self, repr_limit=None):
+        return self.call.describe_mismatch(self.reason, self.details, repr_limit)
+
+    def __str__(self):
+        return self.describe(self.call._repr_limit())
+
+class Arguments(object):
+    """
+    The arguments expected by a call, compiled for fast checking.
+
+    Arguments given as plain values are compared for equality directly,
+    and matchers are only used for arguments given as matchers or arrays.
+    Matchers for plain values are only created when describing the
+    arguments.
+    """
+
+    __slots__ = (
+        "arity",
+        "keyword_names",
+        "literals",
+        "_args",
+        "_kwargs",
+        "_positional_values",
+        "_positional_literals",
+        "_keyword_literals",
+        "_positional_matchers",
+        "_keyword_matchers",
+    )
+
+    def __init__(self, args, kwargs):
+        self.arity = len(args)
+        self.keyword_names = frozenset(kwargs) if kwargs else _NO_KEYWORDS
+        self._args = args
+        self._kwargs = kwargs
+
+        positional_literals = []
+        positional_matchers = []
+        for index, arg in enumerate(args):
+            if is_matcher(arg):
+                positional_matchers.append((index, arg))
+            elif is_array(arg):
+                positional_matchers.append((index, to_matcher(arg)))
+            else:
+                positional_literals.append((index, arg))
+
+        keyword_literals = []
+        keyword_matchers = []
+        for key in kwargs:
+            if is_matcher(kwargs[key]):
+                keyword_matchers.append((key, kwargs[key]))
+            elif is_array(kwargs[key]):
+                keyword_matchers.append((key, to_matcher(kwargs[key])))
+            else:
+                keyword_literals.append((key, kwargs[key]))
+
+        if positional_matchers or keyword_matchers:
+            self.literals = None
+        else:
+            self.literals = (args, kwargs)
+
+        if positional_matchers:
+            self._positional_values = None
+            self._positional_literals = tuple(positional_literals)
+        else:
+            self._positional_values = args
+            self._positional_literals = ()
+        self._keyword_literals = tuple(keyword_literals)
+        self._positional_matchers = tuple(positional_matchers)
+        self._keyword_matchers = tuple(keyword_matchers)
+
+    def describe(self, name, repr_limit=None):
+        return function_call_str(
+            name,
+            [_describe_expected(arg, repr_limit) for arg in self._args],
+            map_values(lambda arg: _describe_expected(arg, repr_limit), self._kwargs),
+        )
+
+    def describe_arguments(self, args, kwargs, repr_limit=None):
+        """
+        Returns descriptions of each expected argument, and whether the
+        given arguments matched them, as a list and a dictionary.
+        """
+        def describe_arg(expected, actual):
+            return "%s [%s]" % (_describe_expected(expected, repr_limit), _explain(expected, actual, repr_limit))
+
+        return (
+            list(map(describe_arg, self._args, args)),
+            dict((key, describe_arg(self._kwargs[key], kwargs[key])) for key in self._kwargs),
+        )
+
+    def mismatch(self, args, kwargs, matcher_cache=None):
+        """
+        Returns None if the given arguments are accepted, otherwise the
+        reason for the mismatch. If matcher_cache is given, it is used to
+        check arguments against matchers.
+        """
+        if len(args) != self.arity:
+            return Mismatch.WRONG_NUMBER_OF_POSITIONAL_ARGUMENTS
+
+        if kwargs.keys() != self.keyword_names:
+            if self.keyword_names.difference(kwargs):
+                return Mismatch.MISSING_KEYWORD_ARGUMENTS
+            else:
+                return Mismatch.UNEXPECTED_KEYWORD_ARGUMENTS
+
+        try:
+            if self._positional_values is not None:
+                if not all(map(eq, self._positional_values, args)):
+                    return Mismatch.ARGUMENTS
+            else:
+                for index, value in self._positional_literals:
+                    if not value == args[index]:
+                        return Mismatch.ARGUMENTS
+
+            for key, value in self._keyword_literals:
+                if not value == kwargs[key]:
+                    return Mismatch.ARGUMENTS
+        except ValueError:
+            # Comparing a plain value with an array gives an array, which
+            # cannot be used as a bool
+            return Mismatch.ARGUMENTS
+
+        is_match = _is_match if matcher_cache is None else matcher_cache.is_match
+
+        for index, matcher in self._positional_matchers:
+            if not is_match(matcher, args[index]):
+                return Mismatch.ARGUMENTS
+
+        for key, matcher in self._keyword_matchers:
+            if not is_match(matcher, kwargs[key]):
+                return Mismatch.ARGUMENTS
+
+        return None
+
+def _describe_expected(expected, repr_limit):
+    # When the length of descriptions is limited, plain values are described
+    # as their matchers would be, but without building their full repr
+    if repr_limit is None or is_matcher(expected) or is_array(expected):
+        return truncate(to_matcher(expected).describe(), repr_limit)
+    else:
+        return bounded_repr(expected, repr_limit)
+
+def _explain(expected, actual, repr_limit):
+    if is_matcher(expected) or is_array(expected) or (repr_limit is None and not is_array(actual)):
+        result = to_matcher(expected).match(actual)
+        if result.is_match:
+            return "matched"
+        else:
+            return truncate(result.explanation, repr_limit)
+    elif not is_array(actual) and expected == actual:
+        return "matched"
+    else:
+        return "was %s" % bounded_repr(actual, repr_limit)
+
+def _is_match(matcher, value):
+    return matcher.match(value).is_match
+
+def table_key(args, kwargs):
+    """
+    Returns the key used to look up the row for the given arguments in a
+    table.
+    """
+    if kwargs:
+        return (tuple(args), tuple(sorted(kwargs.items())))
+    else:
+        return (tuple(args), ())
+
+def _table_rows(rows):
+    table = {}
+    for row in rows:
+        if len(row) == 2:
+            args, value = row
+            kwargs = None
+        else:
+            args, kwargs, value = row
+        table.setdefault(table_key(args, kwargs), value)
+    return table
+
+class TableArguments(object):
+    """
+    The arguments expected by a call set up from a table of rows, each of
+    which has its own arguments and value. The rows are a mapping keyed
+    by table_key(), such as a dict, which requires hashable plain values.
+    """
+
+    __slots__ = ("rows", )
+
+    # The rows may have any number of arguments, so the call is checked
+    # against all invocations
+    arity = None
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mismatch(self, args, kwargs, matcher_cache=None):
+        try:
+            if table_key(args, kwargs) in self.rows:
+                return None
+        except TypeError:
+            # Unhashable arguments cannot be in the table
+            pass
+        return Mismatch.NO_TABLE_ROW
+
+    def describe(self, name, repr_limit=None):
+        return "%s(<table with %s rows>)" % (name, len(self.rows))
+
+class ReturnValue(object):
+    __slots__ = ("value", )
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, args, kwargs):
+        return self.value
+
+class RaiseError(object):
+    __slots__ = ("error", )
+
+    def __init__(self, error):
+        self.error = error
+
+    def __call__(self, args, kwargs):
+        raise self.error
+
+class ReturnTableValue(object):
+    __slots__ = ("rows", )
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __call__(self, args, kwargs):
+        return self.rows[table_key(args, kwargs)]
+
+_return_none = ReturnValue(None)
+
+class ReturnFromStream(object):
+    __slots__ = ("stream", )
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, args, kwargs):
+        return self.stream.take()
+
+class CallAwaitable(object):
+    """
+    The result of invoking an asynchronous call. The call's action is run
+    when this is awaited, without needing a task or event loop.
+
+    CallAwaitable implements the coroutine protocol, so that it can also be
+    passed to functions that require a coroutine, such as
+    asyncio.create_task().
+    """
+
+    __slots__ = ("_call", "_action", "_args", "_kwargs", "_awaited")
+
+    def __init__(self, call, action, args, kwargs):
+        self._call = call
+        self._action = action
+        self._args = args
+        self._kwargs = kwargs
+        self._awaited = False
+        call._count_unawaited(1)
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def send(self, value):
+        self._start()
+        raise StopIteration(self._action(self._args, self._kwargs))
+
+    def throw(self, error, value=None, traceback=None):
+        # The action is never run, as for a coroutine that is cancelled
+        # before it starts
+        self._start()
+        if value is None:
+            value = error() if isinstance(error, type) else error
+        raise value.with_traceback(traceback) if traceback is not None else value
+
+    def close(self):
+        # Closing without awaiting still leaves the call unawaited
+        self._awaited = True
+
+    def _start(self):
+        if self._awaited:
+            raise RuntimeError("cannot reuse already awaited awaitable")
+        self._awaited = True
+        self._call._count_unawaited(-1)
+
+Coroutine.register(CallAwaitable)
+
 class Call(object):
-    _arguments_set = False
+    __slots__ = (
+        "_name",
+        "_call_count",
+        "_action",
+        "_sequences",
+        "_arguments",
+        "_index",
+        "_asynchronous",
+        "_unawaited",
+        "_unsatisfied",
+        "_matcher_cache",
+        "_mocked_calls",
+    )
 
     def __init__(self, name, call_count=InfiniteCallCount()):
         self._name = name
         self._call_count = call_count
-        self._action = lambda: None
-        self._sequences = []
+        self._action = _return_none
+        self._sequences = ()
+        self._arguments = None
+        self._index = None
+        self._asynchronous = False
+        self._unawaited = 0
+        self._unsatisfied = None
+        self._matcher_cache = None
+        # The mocked calls of the mock that owns this call, which make call
+        # counts safe to use from other threads or processes
+        self._mocked_calls = None
 
     def has_name(self, name):
         return self._name == name
 
+    def _copy(self, call_count):
+        # The arguments and action are never mutated, so can be shared
+        call = Call(self._name, call_count)
+        call._arguments = self._arguments
+        call._action = self._action
+        call._asynchronous = self._asynchronous
+        return call
+
     def accepts(self, args, kwargs, mismatch_description):
-        if self._call_count.none_remaining():
-            mismatch_description.append("%s [expectation has already been satisfied]" % str(self))
-            return False
-        if not self._arguments_set:
+        mismatch = self.match(args, kwargs)
+        if mismatch is None:
             return True
+        mismatch_description.append(str(mismatch))
+        return False
 
-        def describe_arg(matcher, result):
-            if result.is_match:
-                explanation = "matched"
-            else:
-                explanation = result.explanation
-
-            return "%s [%s]" % (matcher.describe(), explanation)
+    def match(self, args, kwargs):
+        """
+        Returns None if this call accepts the given arguments, otherwise
+        a Mismatch. The mismatch is only described when converted to a string.
+        """
+        if self._call_count.none_remaining():
+            return Mismatch(self, Mismatch.ALREADY_SATISFIED)
+        if self._arguments is None:
+            return None
 
-        def describe_kwargs(kwarg_matches):
-            return dict(
-                (key, describe_arg(self._allowed_kwargs[key], result))
-                for key, result in kwarg_matches
-            )
+        reason = self._arguments.mismatch(args, kwargs, self._matcher_cache)
+        if reason is None:
+            return None
+        return Mismatch(self, reason, (args, kwargs))
 
-        def describe_mismatch(arg_matches, kwarg_matches):
-            args_desc = map(describe_arg, self._allowed_args, arg_matches)
-            kwargs_desc = describe_kwargs(kwarg_matches)
-            return function_call_str_multiple_lines(self._name, args_desc, kwargs_desc)
+    def describe_mismatch(self, reason, details, repr_limit=None):
+        """
+        Describes why this call did not match. If repr_limit is given, the
+        repr of each argument and the description of each matcher is
+        truncated to that many characters.
+        """
+        if reason == Mismatch.ALREADY_SATISFIED:
+            return "%s [expectation has already been satisfied]" % self.describe(repr_limit)
+        elif reason == Mismatch.WRONG_NUMBER_OF_POSITIONAL_ARGUMENTS:
+            return "%s [wrong number of positional arguments]" % self.describe(repr_limit)
+        elif reason == Mismatch.NO_TABLE_ROW:
+            return "%s [no row for arguments]" % self.describe(repr_limit)
 
-        if len(self._allowed_args) != len(args):
-            mismatch_description.append("%s [wrong number of positional arguments]" % str(self))
-            return False
+        args, kwargs = details
+        allowed_kwargs = self._arguments.keyword_names
 
-        missing_kwargs = set(self._allowed_kwargs.keys()) - set(kwargs.keys())
-        if len(missing_kwargs) > 0:
-            mismatch_description.append("%s [missing keyword arguments: %s]" % (str(self), ", ".join(sorted(missing_kwargs))))
-            return False
+        if reason == Mismatch.MISSING_KEYWORD_ARGUMENTS:
+            missing_kwargs = set(allowed_kwargs) - set(kwargs.keys())
+            return "%s [missing keyword arguments: %s]" % (self.describe(repr_limit), ", ".join(sorted(missing_kwargs)))
+        elif reason == Mismatch.UNEXPECTED_KEYWORD_ARGUMENTS:
+            extra_kwargs = set(kwargs.keys()) - set(allowed_kwargs)
+            return "%s [unexpected keyword arguments: %s]" % (self.describe(repr_limit), ", ".join(extra_kwargs))
 
-        extra_kwargs = set(kwargs.keys()) - set(self._allowed_kwargs.keys())
-        if len(extra_kwargs) > 0:
-            mismatch_description.append("%s [unexpected keyword arguments: %s]" % (str(self), ", ".join(extra_kwargs)))
-            return False
-
-        arg_matches = [
-            matcher.match(arg)
-            for matcher, arg in zip(self._allowed_args, args)
-        ]
-        kwarg_matches = [
-            (key, matcher.match(kwargs[key]))
-            for key, matcher in self._allowed_kwargs.items()
-        ]
-        matches = arg_matches + [match for key, match in kwarg_matches]
-
-        if not all(match.is_match for match in matches):
-            mismatch_description.append(describe_mismatch(arg_matches, kwarg_matches))
-            return False
-
-        return True
+        args_desc, kwargs_desc = self._arguments.describe_arguments(args, kwargs, repr_limit)
+        return function_call_str_multiple_lines(self._name, args_desc, kwargs_desc)
 
     def __call__(self, *args, **kwargs):
         if self._call_count.none_remaining():
             raise FunkyError("Cannot call any more times")
-        if not self.accepts(args, kwargs, []):
+        if self.match(args, kwargs) is not None:
             raise FunkyError("Called with wrong arguments")
-        self._call_count.decrement()
+        if not self._call_count.claim():
+            raise FunkyError("Cannot call any more times")
+        return self._invoke(args, kwargs)
+
+    def _invoke(self, args, kwargs):
+        # Callers must have already checked that the arguments match,
+        # and claimed a call from the call count
+        unsatisfied = self._unsatisfied
+        if unsatisfied is not None:
+            if self._asynchronous:
+                # The awaitable must be checked when verifying
+                unsatisfied[self] = None
+            elif self._call_count.none_remaining():
+                unsatisfied.pop(self, None)
         for sequence in self._sequences:
             sequence.add_actual_call(self)
-        return self._action()
+        if self._asynchronous:
+            return CallAwaitable(self, self._action, args, kwargs)
+        return self._action(args, kwargs)
 
     def with_args(self, *args, **kwargs):
-        self._arguments_set = True
-        self._allowed_args = tuple(map(to_matcher, args))
-        self._allowed_kwargs = dict([(key, to_matcher(kwargs[key])) for key in kwargs])
+        self._arguments = Arguments(args, kwargs)
+        if self._index is not None:
+            self._index.invalidate()
+        return self
+
+    def table(self, rows):
+        """
+        Sets up this call from rows of arguments and return values. Each row
+        is either (args, return_value) or (args, kwargs, return_value).
+        Rows are read once, so may be any iterable, such as a generator
+        reading a file. If rows have the same arguments, the first is used.
+        """
+        rows = _table_rows(rows)
+        return self._table(rows, ReturnTableValue(rows))
+
+    def _table(self, rows, action):
+        self._arguments = TableArguments(rows)
+        self._action = action
+        if self._index is not None:
+            self._index.invalidate()
         return self
 
     def returns(self, return_value):
-        self._action = lambda: return_value
+        self._action = ReturnValue(return_value)
+        return self
+
+    def returns_from(self, iterable, count=None):
+        """
+        Returns the next value from iterable on each invocation. The iterable
+        is read lazily, and invocations are only accepted while it has values
+        left, up to count invocations if count is given. If this call was
+        expected, it is satisfied once the iterable is exhausted or count
+        invocations have been made.
+        """
+        stream = ValueStream(iterable)
+        required = not isinstance(self._call_count, InfiniteCallCount)
+        call_count = StreamCallCount(stream, count, required)
+        if self._mocked_calls is not None:
+            call_count = self._mocked_calls._synchronise(call_count)
+        self._call_count = call_count
+        self._action = ReturnFromStream(stream)
         return self
 
     def raises(self, error):
-        def action():
-            raise error
-        self._action = action
+        self._action = RaiseError(error)
         return self
 
+    def returns_async(self, return_value):
+        self._asynchronous = True
+        return self.returns(return_value)
+
+    def raises_async(self, error):
+        self._asynchronous = True
+        return self.raises(error)
+
+    def _make_asynchronous(self):
+        # Used for methods that are coroutine functions on the base type,
+        # so that all actions are run when the result is awaited
+        self._asynchronous = True
+
+    def _count_unawaited(self, change):
+        mocked_calls = self._mocked_calls
+        lock = None if mocked_calls is None else mocked_calls._lock
+        if lock is None:
+            self._unawaited += change
+        else:
+            with lock:
+                self._unawaited += change
+
+    def has_unawaited_results(self):
+        return self._unawaited > 0
+
     def in_sequence(self, sequence):
-        self._sequences.append(sequence)
+        self._sequences += (sequence, )
         sequence.add_expected_call(self)
         return self
 
     def is_satisfied(self):
         return self._call_count.is_satisfied()
 
-    def __str__(self):
-        if self._arguments_set:
-            return function_call_str(
-                self._name,
-                [arg.describe() for arg in self._allowed_args],
-                map_values(lambda arg: arg.describe(), self._allowed_kwargs),
-            )
+    def describe(self, repr_limit=None):
+        if self._arguments is not None:
+            return self._arguments.describe(self._name, repr_limit)
         return self._name
+
+    def _repr_limit(self):
+        mocked_calls = self._mocked_calls
+        return None if mocked_calls is None else mocked_calls._repr_limit
+
+    def __str__(self):
+        # Calls are described in messages such as sequence errors using the
+        # limit of the mock that owns them
+        return self.describe(self._repr_limit())
@@ -0,0 +1,293 @@
+"""
+Recording invocations of real objects to cassettes, and replaying them
+using mocks.
+
+A cassette is a binary file of records, each holding the arguments of an
+invocation and its pickled outcome, followed by an index of the records
+sorted by a hash of their arguments. Replaying a cassette memory-maps the
+file and looks up each invocation in the index, so records are only read
+when they are needed.
+"""
+
+from bisect import bisect_left
+import pickle
+import struct
+import sys
+
+import funk
+from funk.call import table_key
+from funk.error import FunkyError
+
+
+_MAGIC = b"FUNKCAS1"
+# The lengths of the key and pickled outcome of a record
+_RECORD_HEADER = struct.Struct("<II")
+# The offsets of the method counts and index, the number of records, and
+# the magic bytes again, so that truncated files are detected
+_TRAILER = struct.Struct("<QQQ8s")
+
+
+_SCALAR_TYPES = frozenset([type(None), bool, int, float, complex, str, bytes])
+
+
+def _encode_key(method_name, key):
+    args, kwargs = key
+    return _canonical_repr((method_name, args, kwargs)).encode("utf-8")
+
+
+def _canonical_repr(value):
+    # Equal arguments must give the same key in every process, so the
+    # elements of sets and the items of dictionaries are sorted, and values
+    # whose repr might depend on the process, such as their address or the
+    # hash seed, are rejected
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES:
+        return repr(value)
+    elif value_type is tuple:
+        return "(%s)" % "".join("%s, " % _canonical_repr(element) for element in value)
+    elif value_type is list:
+        return "[%s]" % ", ".join(map(_canonical_repr, value))
+    elif value_type is dict:
+        return "{%s}" % ", ".join(sorted(
+            "%s: %s" % (_canonical_repr(key), _canonical_repr(item))
+            for key, item in value.items()
+        ))
+    elif value_type is set or value_type is frozenset:
+        return "frozenset({%s})" % ", ".join(sorted(map(_canonical_repr, value)))
+    else:
+        raise FunkyError(
+            "Cannot record arguments of type %s: only None, bool, int, float, complex, "
+            "str, bytes, and tuples, lists, dicts and sets of them can be recorded" % value_type.__name__
+        )
+
+
+def _hash_key(encoded_key):
+    import hashlib
+    return int.from_bytes(hashlib.blake2b(encoded_key, digest_size=8).digest(), "little")
+
+
+def _to_little_endian(values):
+    import array
+    values = array.array("Q", values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def record(target, path):
+    """
+    Returns a CassetteRecorder that records invocations of target to the
+    cassette at path. Use the recorder as a context manager to get the
+    recording object, and to write the cassette when done.
+    """
+    return CassetteRecorder(target, CassetteWriter(path))
+
+
+def replay(mocks, path, base=None, name=None):
+    """
+    Creates a mock using mocks that allows each invocation recorded in the
+    cassette at path, returning or raising the recorded outcome.
+    """
+    cassette = Cassette(path)
+    mock = mocks.mock(base, name)
+    for method_name, count in cassette.methods.items():
+        if method_name is None:
+            call = funk.allows_call(mock)
+        else:
+            call = funk.allows(mock, method_name)
+        rows = CassetteRows(cassette, method_name, count)
+        call._table(rows, ReplayOutcome(rows))
+    return mock
+
+
+class CassetteRecorder(object):
+    def __init__(self, target, writer):
+        self._writer = writer
+        self.recording = RecordingObject(target, writer)
+
+    def __enter__(self):
+        return self.recording
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._writer.close()
+
+
+class RecordingObject(object):
+    """
+    Passes invocations of methods on to the target, and records them. Other
+    attributes of the target are returned without being recorded.
+    """
+
+    __slots__ = ("_funk_target", "_funk_writer")
+
+    def __init__(self, target, writer):
+        object.__setattr__(self, "_funk_target", target)
+        object.__setattr__(self, "_funk_writer", writer)
+
+    def __getattr__(self, name):
+        value = getattr(self._funk_target, name)
+        if callable(value):
+            return RecordingMethod(self._funk_writer, name, value)
+        else:
+            return value
+
+    def __call__(self, *args, **kwargs):
+        return RecordingMethod(self._funk_writer, None, self._funk_target)(*args, **kwargs)
+
+
+class RecordingMethod(object):
+    __slots__ = ("_writer", "_method_name", "_method")
+
+    def __init__(self, writer, method_name, method):
+        self._writer = writer
+        self._method_name = method_name
+        self._method = method
+
+    def __call__(self, *args, **kwargs):
+        # The arguments are checked before the target is invoked, so that
+        # arguments that cannot be recorded have no effect on the target
+        key = _encode_key(self._method_name, table_key(args, kwargs))
+        try:
+            value = self._method(*args, **kwargs)
+        except Exception as error:
+            self._writer.write(self._method_name, key, (True, error))
+            raise
+        self._writer.write(self._method_name, key, (False, value))
+        return value
+
+
+class CassetteWriter(object):
+    """
+    Writes records to a cassette as they are made, and the index when
+    closed. If the same arguments are recorded more than once for a method,
+    only the first outcome is kept.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._file.write(_MAGIC)
+        self._keys = set()
+        self._entries = []
+        self._method_counts = {}
+
+    def write(self, method_name, key, outcome):
+        if key in self._keys:
+            return
+        value = pickle.dumps(outcome, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._entries.append((_hash_key(key), self._file.tell()))
+        self._file.write(_RECORD_HEADER.pack(len(key), len(value)))
+        self._file.write(key)
+        self._file.write(value)
+        self._keys.add(key)
+        self._method_counts[method_name] = self._method_counts.get(method_name, 0) + 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._entries.sort()
+        methods_offset = self._file.tell()
+        self._file.write(pickle.dumps(self._method_counts, protocol=pickle.HIGHEST_PROTOCOL))
+        index_offset = self._file.tell()
+        self._file.write(_to_little_endian(entry_hash for entry_hash, offset in self._entries))
+        self._file.write(_to_little_endian(offset for entry_hash, offset in self._entries))
+        self._file.write(_TRAILER.pack(methods_offset, index_offset, len(self._entries), _MAGIC))
+        self._file.close()
+
+
+class Cassette(object):
+    """
+    A memory-mapped cassette. methods maps the name of each recorded method,
+    or None for invocations of the object itself, to its number of records.
+    """
+
+    def __init__(self, path):
+        import mmap
+        with open(path, "rb") as fileobj:
+            self._memory = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._memory) < len(_MAGIC) + _TRAILER.size or self._memory[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("%s is not a cassette" % path)
+        methods_offset, index_offset, count, magic = _TRAILER.unpack_from(self._memory, len(self._memory) - _TRAILER.size)
+        if magic != _MAGIC:
+            raise ValueError("%s is not a complete cassette" % path)
+
+        self._count = count
+        self._hashes = self._index_array(index_offset, count)
+        self._offsets = self._index_array(index_offset + 8 * count, count)
+        self.methods = pickle.loads(self._memory[methods_offset:index_offset])
+
+    def _index_array(self, offset, count):
+        view = memoryview(self._memory)[offset:offset + 8 * count].cast("Q")
+        if sys.byteorder == "big":
+            import array
+            view = array.array("Q", view)
+            view.byteswap()
+        return view
+
+    def find(self, method_name, key):
+        """
+        Returns the position of the pickled outcome recorded for the
+        arguments, as a (start, end) pair, or None if there is none.
+        """
+        try:
+            encoded_key = _encode_key(method_name, key)
+        except FunkyError:
+            # Arguments that cannot be recorded are never in a cassette
+            return None
+        key_hash = _hash_key(encoded_key)
+        position = bisect_left(self._hashes, key_hash)
+        while position < self._count and self._hashes[position] == key_hash:
+            offset = self._offsets[position]
+            key_length, value_length = _RECORD_HEADER.unpack_from(self._memory, offset)
+            key_start = offset + _RECORD_HEADER.size
+            value_start = key_start + key_length
+            if self._memory[key_start:value_start] == encoded_key:
+                return value_start, value_start + value_length
+            position += 1
+        return None
+
+    def outcome(self, method_name, key):
+        position = self.find(method_name, key)
+        if position is None:
+            raise KeyError(key)
+        start, end = position
+        return pickle.loads(self._memory[start:end])
+
+
+class CassetteRows(object):
+    """
+    The records of a method in a cassette, as rows of a table.
+    """
+
+    __slots__ = ("_cassette", "_method_name", "_count")
+
+    def __init__(self, cassette, method_name, count):
+        self._cassette = cassette
+        self._method_name = method_name
+        self._count = count
+
+    def __contains__(self, key):
+        return self._cassette.find(self._method_name, key) is not None
+
+    def __getitem__(self, key):
+        return self._cassette.outcome(self._method_name, key)
+
+    def __len__(self):
+        return self._count
+
+
+class ReplayOutcome(object):
+    __slots__ = ("rows", )
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __call__(self, args, kwargs):
+        raised, value = self.rows[table_key(args, kwargs)]
+        if raised:
+            raise value
+        return value
@@ -0,0 +1,139 @@
+_NO_KEYWORDS = frozenset()
+
+_PLAIN_LITERAL_TYPES = frozenset([str, bytes, int, float, bool, complex, type(None)])
+
+
+def is_plain_literal(value):
+    # Only values of builtin types are hashed, since their hashing is
+    # consistent with their equality. Arbitrary objects may define __eq__ in
+    # ways that a hash lookup cannot reproduce.
+    value_type = type(value)
+    if value_type in _PLAIN_LITERAL_TYPES:
+        return True
+    elif value_type is tuple or value_type is frozenset:
+        return all(map(is_plain_literal, value))
+    else:
+        return False
+
+
+def _shape_of(args, kwargs):
+    if kwargs:
+        return (len(args), frozenset(kwargs))
+    else:
+        return (len(args), _NO_KEYWORDS)
+
+
+class CallIndex(object):
+    """
+    The ordered expectations for a single mocked function.
+
+    Candidates are partitioned by shape: the number of positional arguments
+    and the set of keyword argument names. Within a shape, expectations whose
+    arguments are all plain literals are found by hashing the actual
+    arguments, while expectations using matchers are scanned in order.
+    The index is built lazily, and rebuilt whenever an expectation is added
+    or has its arguments changed.
+    """
+
+    __slots__ = ("_calls", "_lookup")
+
+    def __init__(self):
+        self._calls = []
+        # The shapes and wildcards are replaced together, so that a
+        # partially built index is never seen by other threads
+        self._lookup = None
+
+    def append(self, call):
+        call._index = self
+        self._calls.append(call)
+        self.invalidate()
+
+    def clear(self):
+        del self._calls[:]
+        self.invalidate()
+
+    def invalidate(self):
+        self._lookup = None
+
+    def __iter__(self):
+        return iter(self._calls)
+
+    def __len__(self):
+        return len(self._calls)
+
+    def candidates(self, args, kwargs):
+        """
+        Returns the expectations that might accept the given arguments,
+        in the order they were defined. Any expectation that is not returned
+        is guaranteed not to accept the arguments.
+        """
+        lookup = self._lookup
+        if lookup is None:
+            lookup = self._lookup = self._build()
+        shapes, wildcards = lookup
+
+        shape = shapes.get(_shape_of(args, kwargs))
+        if shape is None:
+            entries = wildcards
+        elif not wildcards:
+            entries = shape.candidates(args, kwargs)
+        else:
+            entries = sorted(shape.candidates(args, kwargs) + wildcards)
+
+        return [call for position, call in entries]
+
+    def _build(self):
+        shapes = {}
+        wildcards = []
+        for position, call in enumerate(self._calls):
+            entry = (position, call)
+            arguments = call._arguments
+            if arguments is None or arguments.arity is None:
+                wildcards.append(entry)
+            else:
+                shape_key = (arguments.arity, arguments.keyword_names)
+                shape = shapes.get(shape_key)
+                if shape is None:
+                    shape = shapes[shape_key] = _Shape(sorted(arguments.keyword_names))
+                shape.add(entry, arguments.literals)
+
+        return shapes, wildcards
+
+
+class _Shape(object):
+    __slots__ = ("_keyword_names", "_entries", "_literals", "_others")
+
+    def __init__(self, keyword_names):
+        self._keyword_names = keyword_names
+        self._entries = []
+        self._literals = {}
+        self._others = []
+
+    def add(self, entry, literal_arguments):
+        self._entries.append(entry)
+        if literal_arguments is not None:
+            key = self._key(*literal_arguments)
+            if is_plain_literal(key):
+                self._literals.setdefault(key, []).append(entry)
+                return
+
+        self._others.append(entry)
+
+    def candidates(self, args, kwargs):
+        key = self._key(args, kwargs)
+        if not is_plain_literal(key):
+            return self._entries
+
+        literals = self._literals.get(key)
+        if literals is None:
+            return self._others
+        elif not self._others:
+            return literals
+        else:
+            return sorted(literals + self._others)
+
+    def _key(self, args, kwargs):
+        if self._keyword_names:
+            return tuple(args) + tuple(kwargs[name] for name in self._keyword_names)
+        else:
+            return tuple(args)
@@ -1,8 +1,95 @@
-import precisely
+import sys
+
+
+def is_matcher(value):
+    # precisely is only imported when first needed. Until it has been
+    # imported by someone, no value can be a matcher.
+    precisely = sys.modules.get("precisely")
+    return precisely is not None and precisely.is_matcher(value)
+
+
+def is_array(value):
+    # Arrays are compared elementwise by ==, so are matched using array
+    # matchers instead. Until numpy has been imported by someone, no value
+    # can be an array.
+    if sys.modules.get("numpy") is None:
+        return False
+    value_type = type(value)
+    return hasattr(value_type, "__array__") or hasattr(value_type, "__array_interface__")
 
 
 def to_matcher(value):
+    import precisely
     if precisely.is_matcher(value):
         return value
+    elif is_array(value):
+        return array_equal_to(value)
     else:
         return precisely.equal_to(value)
+
+
+def array_equal_to(expected):
+    """
+    Matches arrays with the same shape and elements as expected. The dtypes
+    of the arrays are not compared.
+    """
+    from funk.arrays import ArrayEqualToMatcher
+    return ArrayEqualToMatcher(expected)
+
+
+def array_close_to(expected, rtol=1e-05, atol=1e-08, equal_nan=False):
+    """
+    Matches arrays with the same shape as expected, and elements within the
+    given tolerances of the expected elements, as numpy.isclose().
+    """
+    from funk.arrays import ArrayCloseToMatcher
+    return ArrayCloseToMatcher(expected, rtol, atol, equal_nan)
+
+
+def array_with(shape=None, dtype=None):
+    """
+    Matches arrays with the given shape and dtype, if given.
+    """
+    from funk.arrays import ArrayWithMatcher
+    return ArrayWithMatcher(shape, dtype)
+
+
+class MatcherCache(object):
+    """
+    Remembers whether matchers matched arguments, so that the same matcher
+    is not run again against the same argument object.
+
+    Results are keyed on the identity of the matcher and the argument, so
+    the cache is only correct if arguments are not mutated once they have
+    been passed to a mock. Only the capacity most recently used results are
+    kept. References to the matchers and arguments are kept alongside each
+    result, so that their identities cannot be reused while cached.
+    """
+
+    def __init__(self, capacity=1024):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        import collections
+        self._capacity = capacity
+        self._results = collections.OrderedDict()
+
+    def is_match(self, matcher, value):
+        key = (id(matcher), id(value))
+        results = self._results
+        entry = results.pop(key, None)
+        if entry is None:
+            entry = (matcher, value, matcher.match(value).is_match)
+        results[key] = entry
+        if len(results) > self._capacity:
+            try:
+                results.popitem(last=False)
+            except KeyError:
+                # Another thread has already evicted the oldest result
+                pass
+        return entry[2]
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        self._results.clear()
@@ -0,0 +1,31 @@
+"""
+A pytest plugin that provides a mocks fixture, which is verified when the
+test finishes. The plugin is registered when Funk is installed.
+"""
+
+import pytest
+
+import funk
+
+
+_call_passed = pytest.StashKey()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if call.when == "call":
+        item.stash[_call_passed] = outcome.get_result().passed
+
+
+@pytest.fixture
+def mocks(request):
+    """
+    A Mocks that is verified when the test finishes. Expectations are only
+    verified if the test itself passed, and not if it failed, was skipped
+    or was expected to fail.
+    """
+    mocks = funk.Mocks()
+    yield mocks
+    if request.node.stash.get(_call_passed, False):
+        mocks.verify()
@@ -0,0 +1,115 @@
+import itertools
+
+from funk.util import function_call_str, map_values
+
+
+class Recording(object):
+    """
+    Settings for recording the invocations of each mock.
+
+    Only the last capacity recorded invocations of each mock are kept. If
+    every is greater than one, only every nth invocation is recorded. If
+    fingerprints is True, a hash of the arguments is kept instead of the
+    arguments themselves, so that recorded arguments are not kept alive.
+    """
+
+    def __init__(self, capacity=100, every=1, fingerprints=False):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.capacity = capacity
+        self.every = every
+        self.fingerprints = fingerprints
+
+    def buffer(self):
+        return InvocationBuffer(self.capacity, self.every, self.fingerprints)
+
+
+class InvocationBuffer(object):
+    """
+    A ring buffer of recorded invocations, stored in preallocated arrays.
+    """
+
+    __slots__ = ("_capacity", "_every", "_counter", "_recorded", "_names", "_args", "_kwargs", "_fingerprints")
+
+    def __init__(self, capacity, every, fingerprints):
+        self._capacity = capacity
+        self._every = every
+        # Taking the next value from a count is atomic, so invocations from
+        # different threads are given different positions without a lock
+        self._counter = itertools.count()
+        self._recorded = 0
+        self._names = [None] * capacity
+        if fingerprints:
+            import array
+            self._fingerprints = array.array("q", bytes(8 * capacity))
+            self._args = None
+            self._kwargs = None
+        else:
+            self._fingerprints = None
+            self._args = [None] * capacity
+            self._kwargs = [None] * capacity
+
+    def record(self, name, args, kwargs):
+        invocation = next(self._counter)
+        if invocation % self._every:
+            return
+        position = invocation // self._every
+        slot = position % self._capacity
+        self._names[slot] = name
+        if self._fingerprints is None:
+            self._args[slot] = args
+            self._kwargs[slot] = kwargs
+        else:
+            self._fingerprints[slot] = _fingerprint(args, kwargs)
+        if position >= self._recorded:
+            self._recorded = position + 1
+
+    def invocations(self):
+        """
+        Returns the kept invocations, oldest first.
+        """
+        recorded = self._recorded
+        start = max(0, recorded - self._capacity)
+        return [self._invocation(position % self._capacity) for position in range(start, recorded)]
+
+    def _invocation(self, slot):
+        if self._fingerprints is None:
+            return Invocation(self._names[slot], self._args[slot], self._kwargs[slot], None)
+        else:
+            return Invocation(self._names[slot], None, None, self._fingerprints[slot])
+
+
+def _fingerprint(args, kwargs):
+    try:
+        return hash((args, tuple(sorted(kwargs.items()))))
+    except TypeError:
+        return hash((
+            tuple(map(repr, args)),
+            tuple(sorted(map_values(repr, kwargs).items())),
+        ))
+
+
+class Invocation(object):
+    """
+    A recorded invocation of a mock. Either args and kwargs or fingerprint
+    is None, depending on whether fingerprints were recorded.
+    """
+
+    __slots__ = ("name", "args", "kwargs", "fingerprint")
+
+    def __init__(self, name, args, kwargs, fingerprint):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.fingerprint = fingerprint
+
+    def __str__(self):
+        if self.fingerprint is None:
+            return function_call_str(self.name, map(repr, self.args), map_values(repr, self.kwargs))
+        else:
+            return "%s(<fingerprint %x>)" % (self.name, self.fingerprint & 0xffffffffffffffff)
+
+    def __repr__(self):
+        return "<Invocation %s>" % self
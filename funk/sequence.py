@@ -1,16 +1,32 @@
 class Sequence(object):
-    def __init__(self):
+    __slots__ = ("_expected_calls", "_position", "_lock")
+
+    def __init__(self, lock=None):
         self._expected_calls = []
-    
+        self._position = 0
+        self._lock = lock
+
+    def _reset(self):
+        del self._expected_calls[:]
+        self._position = 0
+
     def add_expected_call(self, call):
         self._expected_calls.append(call)
-        
+
     def add_actual_call(self, call):
-        while len(self._expected_calls) and call is not self._expected_calls[0] and self._expected_calls[0].is_satisfied():
-            self._expected_calls.pop(0)
-        if not self._expected_calls:
-            raise AssertionError("Invocation out of order. Expected no more calls in sequence, but got %s." % call)
-        if call is not self._expected_calls[0]:
-            raise AssertionError("Invocation out of order. Expected %s, but got %s." % (self._expected_calls[0], call))
-        
+        if self._lock is None:
+            self._add_actual_call(call)
+        else:
+            with self._lock:
+                self._add_actual_call(call)
 
+    def _add_actual_call(self, call):
+        expected_calls = self._expected_calls
+        position = self._position
+        while position < len(expected_calls) and call is not expected_calls[position] and expected_calls[position].is_satisfied():
+            position += 1
+        self._position = position
+        if position == len(expected_calls):
+            raise AssertionError("Invocation out of order. Expected no more calls in sequence, but got %s." % call)
+        if call is not expected_calls[position]:
+            raise AssertionError("Invocation out of order. Expected %s, but got %s." % (expected_calls[position], call))
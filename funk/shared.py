@@ -0,0 +1,108 @@
+from funk.call import IntegerCallCount
+from funk.call import StreamCallCount
+from funk.error import FunkyError
+from funk.sequence import Sequence
+
+
+_SLOT_SIZE = 8
+_SLOTS_PER_CHUNK = 4096
+
+
+class SharedCounters(object):
+    """
+    Integer counters stored in anonymous shared memory, so that updates made
+    by processes forked after a counter was allocated are seen by all of
+    them. Updates are made under a single process-shared lock.
+    """
+
+    def __init__(self):
+        import multiprocessing
+        self.lock = multiprocessing.Lock()
+        self._chunks = []
+        self._free_slot = _SLOTS_PER_CHUNK
+
+    def allocate(self, value):
+        if self._free_slot == _SLOTS_PER_CHUNK:
+            import mmap
+            memory = mmap.mmap(-1, _SLOTS_PER_CHUNK * _SLOT_SIZE)
+            self._chunks.append(memoryview(memory).cast("q"))
+            self._free_slot = 0
+        chunk = self._chunks[-1]
+        slot = self._free_slot
+        self._free_slot += 1
+        chunk[slot] = value
+        return SharedCounter(chunk, slot, self.lock)
+
+    def share(self, call_count):
+        """
+        Returns a call count backed by shared memory that starts with the
+        same number of calls remaining as call_count. Call counts that have
+        no state to share are returned unchanged.
+        """
+        if isinstance(call_count, IntegerCallCount):
+            return SharedCallCount(self.allocate(call_count._count))
+        elif isinstance(call_count, StreamCallCount):
+            # The values of an iterable cannot be shared between processes
+            raise FunkyError("Cannot return values from an iterable on mocks of fork-safe Mocks")
+        else:
+            return call_count
+
+
+class SharedCounter(object):
+    __slots__ = ("_chunk", "_slot", "lock")
+
+    def __init__(self, chunk, slot, lock):
+        self._chunk = chunk
+        self._slot = slot
+        self.lock = lock
+
+    def get(self):
+        return self._chunk[self._slot]
+
+    def set(self, value):
+        self._chunk[self._slot] = value
+
+
+class SharedCallCount(object):
+    __slots__ = ("_counter", )
+
+    def __init__(self, counter):
+        self._counter = counter
+
+    def none_remaining(self):
+        return self._counter.get() <= 0
+
+    def decrement(self):
+        with self._counter.lock:
+            self._counter.set(self._counter.get() - 1)
+
+    def claim(self):
+        with self._counter.lock:
+            count = self._counter.get()
+            if count <= 0:
+                return False
+            self._counter.set(count - 1)
+            return True
+
+    def is_satisfied(self):
+        return self.none_remaining()
+
+
+class SharedSequence(Sequence):
+    """
+    A sequence whose position is stored in shared memory.
+    """
+
+    __slots__ = ("_counter", )
+
+    def __init__(self, counters):
+        self._counter = counters.allocate(0)
+        super(SharedSequence, self).__init__(lock=counters.lock)
+
+    @property
+    def _position(self):
+        return self._counter.get()
+
+    @_position.setter
+    def _position(self, position):
+        self._counter.set(position)
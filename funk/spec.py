@@ -0,0 +1,73 @@
+import weakref
+
+
+_MISSING = 0
+_NOT_CALLABLE = 1
+_CALLABLE = 2
+_COROUTINE_FUNCTION = 3
+
+_specs = weakref.WeakKeyDictionary()
+
+
+def spec_for(base):
+    """
+    Returns the Spec for the type base, shared by all mocks of that type.
+    """
+    try:
+        return _specs[base]
+    except KeyError:
+        spec = _specs[base] = Spec(base)
+        return spec
+    except TypeError:
+        # base cannot be weakly referenced, so cannot be cached
+        return Spec(base)
+
+
+class Spec(object):
+    """
+    The attributes of a base type, as used by mocks of that type.
+
+    Each attribute name is looked up on the base type at most once, so
+    attributes added to or removed from the type after it has first been
+    mocked are not seen by later mocks.
+    """
+
+    def __init__(self, base):
+        # The cache is keyed weakly on the base type, so the spec must not
+        # keep the type alive
+        try:
+            self._base = weakref.ref(base)
+        except TypeError:
+            self._base = lambda: base
+        # Maps attribute names to the kind of attribute
+        self._attributes = {}
+        # The name given to mocks of the type when no name is given, set
+        # by Mocks when first needed
+        self.mock_name = None
+
+    def has_attribute(self, name):
+        return self._lookup(name) != _MISSING
+
+    def is_callable(self, name):
+        return self._lookup(name) >= _CALLABLE
+
+    def is_coroutine_function(self, name):
+        return self._lookup(name) == _COROUTINE_FUNCTION
+
+    def _lookup(self, name):
+        attribute = self._attributes.get(name)
+        if attribute is None:
+            base = self._base()
+            if hasattr(base, name):
+                value = getattr(base, name)
+                import inspect
+                if inspect.iscoroutinefunction(value):
+                    attribute = _COROUTINE_FUNCTION
+                elif callable(value):
+                    attribute = _CALLABLE
+                else:
+                    attribute = _NOT_CALLABLE
+            else:
+                attribute = _MISSING
+            self._attributes[name] = attribute
+        return attribute
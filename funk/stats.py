@@ -0,0 +1,84 @@
+class Stats(object):
+    """
+    Statistics about invocations of mocks, collected when Mocks is created
+    with stats=True.
+    """
+
+    def __init__(self):
+        self._methods = {}
+
+    def for_method(self, mock_name, method_name):
+        """
+        Returns the MethodStats for a method on a mock, or for calls on the
+        mock itself if method_name is None. Mocks with the same name share
+        their statistics.
+        """
+        key = (mock_name, method_name)
+        method_stats = self._methods.get(key)
+        if method_stats is None:
+            method_stats = self._methods[key] = MethodStats(mock_name, method_name)
+        return method_stats
+
+    def methods(self):
+        return list(self._methods.values())
+
+    @property
+    def invocations(self):
+        return sum(method.invocations for method in self._methods.values())
+
+    @property
+    def expectations_scanned(self):
+        return sum(method.expectations_scanned for method in self._methods.values())
+
+    @property
+    def matcher_time(self):
+        return sum(method.matcher_time for method in self._methods.values())
+
+    @property
+    def action_time(self):
+        return sum(method.action_time for method in self._methods.values())
+
+    @property
+    def mismatch_descriptions(self):
+        return sum(method.mismatch_descriptions for method in self._methods.values())
+
+    def report(self):
+        lines = ["{0:<40} {1:>10} {2:>10} {3:>10} {4:>12} {5:>12}".format(
+            "method", "calls", "scanned", "max", "matchers (s)", "actions (s)",
+        )]
+        for method in sorted(self._methods.values(), key=lambda method: -method.invocations):
+            lines.append("{0:<40} {1:>10} {2:>10} {3:>10} {4:>12.6f} {5:>12.6f}".format(
+                method.name,
+                method.invocations,
+                method.expectations_scanned,
+                method.max_expectations_scanned,
+                method.matcher_time,
+                method.action_time,
+            ))
+        return "\n".join(lines)
+
+
+class MethodStats(object):
+    def __init__(self, mock_name, method_name):
+        self.mock_name = mock_name
+        self.method_name = method_name
+        self.invocations = 0
+        self.unexpected_invocations = 0
+        self.expectations_scanned = 0
+        self.max_expectations_scanned = 0
+        self.matcher_time = 0.0
+        self.action_time = 0.0
+        self.mismatch_descriptions = 0
+
+    @property
+    def name(self):
+        if self.method_name is None:
+            return self.mock_name
+        else:
+            return "%s.%s" % (self.mock_name, self.method_name)
+
+    def record_dispatch(self, expectations_scanned):
+        self.invocations += 1
+        self.expectations_scanned += expectations_scanned
+        if expectations_scanned > self.max_expectations_scanned:
+            self.max_expectations_scanned = expectations_scanned
@@ -1,17 +1,167 @@
+import keyword
+
+
 class Data(object):
-    def __init__(self, attributes):
-        self._keys = list(attributes.keys())
-        for key in attributes:
-            setattr(self, key, attributes[key])
+    """
+    A simple record whose attributes are given by keyword arguments. Records
+    are equal when they have the same attributes with equal values. Other
+    attributes may be set later, but are not part of the record's value. Since
+    their attributes can be reassigned, records are hashed by identity, as
+    a value hash would change while a record is in a set or dictionary.
+
+    Calling Data directly is the same as calling data() with the keys and
+    values of a mapping.
+    """
+
+    __slots__ = ()
+
+    _fields = ()
+
+    def __new__(cls, attributes):
+        return _record(attributes)
+
+    def __reduce__(self):
+        return (Data, (dict(self._items()), ))
+
+    def _values(self):
+        return tuple(getattr(self, key) for key in self._fields)
+
+    def _items(self):
+        return list(zip(self._fields, self._values()))
+
+    def __eq__(self, other):
+        if type(self) is type(other) and type(self) is not DataView:
+            return self._values() == other._values()
+        elif isinstance(other, Data):
+            return dict(self._items()) == dict(other._items())
+        else:
+            return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = object.__hash__
 
     def __str__(self):
         return "Data({0})".format(", ".join(
-            "{0}={1!r}".format(key, getattr(self, key))
-            for key in self._keys
+            "{0}={1!r}".format(key, value)
+            for key, value in self._items()
         ))
-    
+
     def __repr__(self):
         return str(self)
 
+
+class DataView(Data):
+    """
+    A record whose attributes are the keys of an existing mapping. The
+    mapping is not copied: reading an attribute reads the mapping, and
+    setting an attribute writes to the mapping.
+    """
+
+    __slots__ = ("_mapping", )
+
+    def __new__(cls, mapping):
+        self = object.__new__(cls)
+        object.__setattr__(self, "_mapping", mapping)
+        return self
+
+    def __init__(self, mapping):
+        # The mapping is set by __new__, since Data(attributes) returns a
+        # DataView of a copy of attributes, and Python then calls __init__
+        # with the original attributes
+        pass
+
+    @property
+    def _fields(self):
+        return tuple(self._mapping)
+
+    def __getattr__(self, name):
+        try:
+            return self._mapping[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self._mapping[name] = value
+
+    def __reduce__(self):
+        return (DataView, (self._mapping, ))
+
+    def _items(self):
+        return list(self._mapping.items())
+
+
+# Record classes by their keys in order, or None for keys that cannot be
+# used as slots
+_record_classes = {}
+
+
+def _record_class(keys):
+    try:
+        return _record_classes[keys]
+    except KeyError:
+        pass
+
+    if all(map(_is_slot_name, keys)):
+        record_class = _create_record_class(keys)
+    else:
+        record_class = None
+    _record_classes[keys] = record_class
+    return record_class
+
+
+def _is_slot_name(key):
+    # Names starting with two underscores would be mangled, and names used
+    # by Data itself would be hidden by the slots.
+    return (
+        isinstance(key, str) and
+        key.isidentifier() and
+        not keyword.iskeyword(key) and
+        not key.startswith("__") and
+        not hasattr(Data, key)
+    )
+
+
+def _create_record_class(keys):
+    # As with collections.namedtuple, the constructor is generated so that
+    # each attribute is set by a plain assignment.
+    source = "def _create(attributes):\n    self = _new(_class)\n{0}    return self\n\ndef _values(self):\n    return ({1})\n".format(
+        "".join("    self.{0} = attributes[{0!r}]\n".format(key) for key in keys),
+        "".join("self.{0}, ".format(key) for key in keys),
+    )
+    namespace = {"_new": object.__new__}
+    exec(source, namespace)
+
+    # Attributes other than the keys can still be set, and are stored in a
+    # dictionary that is only created when the first one is set. As before
+    # records had slots, they are not part of the record's value, so are
+    # neither compared nor shown.
+    record_class = namespace["_class"] = type("Data", (Data, ), {
+        "__slots__": keys + ("__dict__", ),
+        "__module__": __name__,
+        "_values": namespace["_values"],
+        "_fields": keys,
+    })
+    record_class._create = staticmethod(namespace["_create"])
+    return record_class
+
+
+def _record(attributes):
+    record_class = _record_class(tuple(attributes))
+    if record_class is None:
+        return DataView(dict(attributes))
+    else:
+        return record_class._create(attributes)
+
+
 def data(**kwargs):
-    return Data(kwargs)
+    return _record(kwargs)
+
+
+def data_view(mapping):
+    """
+    Returns a record backed by mapping, without copying it.
+    """
+    return DataView(mapping)
@@ -21,3 +21,55 @@ def map_values(func, dict_):
         (key, func(value))
         for key, value in dict_.items()
     )
+
+def truncate(text, limit=None):
+    if limit is None or len(text) <= limit:
+        return text
+    else:
+        return text[:limit] + "..."
+
+def bounded_repr(value, limit=None):
+    """
+    Returns the repr of value, truncated to limit characters if limit is
+    given. Long strings, bytes, lists, tuples and dictionaries are only
+    partially converted, so their full repr is never built.
+    """
+    if limit is None:
+        return repr(value)
+    else:
+        return truncate(_partial_repr(value, limit + 1), limit)
+
+def _partial_repr(value, limit):
+    # Returns either the full repr of value, or a string of at least limit
+    # characters that starts like it
+    limit = max(limit, 1)
+    value_type = type(value)
+    if value_type in (str, bytes, bytearray):
+        if len(value) > limit:
+            return repr(value[:limit])
+        else:
+            return repr(value)
+
+    if value_type is list:
+        start, end, items = "[", "]", value
+    elif value_type is tuple:
+        start, end, items = "(", ",)" if len(value) == 1 else ")", value
+    elif value_type is dict:
+        start, end, items = "{", "}", value.items()
+    else:
+        return repr(value)
+
+    parts = []
+    length = len(start)
+    for item in items:
+        if length >= limit:
+            return start + ", ".join(parts)
+        if value_type is dict:
+            key, item_value = item
+            key_repr = _partial_repr(key, limit - length)
+            part = "%s: %s" % (key_repr, _partial_repr(item_value, limit - length - len(key_repr) - 2))
+        else:
+            part = _partial_repr(item, limit - length)
+        parts.append(part)
+        length += len(part) + 2
+    return start + ", ".join(parts) + end
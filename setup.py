@@ -18,6 +18,9 @@ setup(
     packages=['funk'],
     keywords="mock",
     install_requires=["precisely>=0.1.1"],
+    entry_points={
+        "pytest11": ["funk = funk.pytest_plugin"],
+    },
     python_requires='>=3.5',
     license='BSD License'
 )
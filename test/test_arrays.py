@@ -0,0 +1,92 @@
+import pytest
+from precisely import assert_that, equal_to, has_attrs
+
+import funk
+from funk import allows, UnexpectedInvocationError
+from funk.matchers import array_close_to, array_equal_to, array_with, to_matcher
+from .util import assert_raises, assert_raises_str
+
+
+numpy = pytest.importorskip("numpy")
+
+
+def test_array_equal_to_matches_arrays_with_same_elements():
+    matcher = array_equal_to(numpy.array([1, 2, 3]))
+
+    assert_that(matcher.match(numpy.array([1, 2, 3])), has_attrs(is_match=True))
+    assert_that(matcher.match(numpy.array([1.0, 2.0, 3.0])), has_attrs(is_match=True))
+
+def test_array_equal_to_explains_first_different_element():
+    matcher = array_equal_to(numpy.array([[1, 2], [3, 4]]))
+
+    result = matcher.match(numpy.array([[1, 2], [5, 6]]))
+
+    assert_that(result, has_attrs(is_match=False, explanation="was 5 at index (1, 0), expected 3"))
+
+def test_array_equal_to_does_not_match_arrays_with_different_shape():
+    matcher = array_equal_to(numpy.array([1, 2, 3]))
+
+    result = matcher.match(numpy.array([1, 2]))
+
+    assert_that(result, has_attrs(is_match=False, explanation="had shape (2,)"))
+
+def test_array_equal_to_does_not_match_values_that_are_not_arrays():
+    matcher = array_equal_to(numpy.array([1, 2]))
+
+    result = matcher.match([1, 2])
+
+    assert_that(result, has_attrs(is_match=False, explanation="was [1, 2]"))
+
+def test_array_equal_to_matches_buffers():
+    matcher = array_equal_to(numpy.array([1, 2], dtype="uint8"))
+
+    assert_that(matcher.match(memoryview(bytearray([1, 2]))), has_attrs(is_match=True))
+
+def test_array_close_to_matches_arrays_within_tolerance():
+    matcher = array_close_to(numpy.array([1.0, 2.0]), atol=0.1)
+
+    assert_that(matcher.match(numpy.array([1.05, 1.95])), has_attrs(is_match=True))
+    assert_that(matcher.match(numpy.array([1.05, 2.5])), has_attrs(is_match=False))
+
+def test_array_with_matches_shape_and_dtype():
+    matcher = array_with(shape=(2, 2), dtype="float64")
+
+    assert_that(matcher.match(numpy.zeros((2, 2))), has_attrs(is_match=True))
+    assert_that(matcher.match(numpy.zeros((2, 3))), has_attrs(is_match=False, explanation="had shape (2, 3)"))
+    assert_that(matcher.match(numpy.zeros((2, 2), dtype="int32")), has_attrs(is_match=False, explanation="had dtype int32"))
+    assert_that(matcher.describe(), equal_to("array with shape (2, 2) and dtype float64"))
+
+def test_to_matcher_uses_array_equal_to_for_arrays():
+    matcher = to_matcher(numpy.array([1, 2]))
+
+    assert_that(matcher.describe(), equal_to("array equal to array([1, 2])"))
+
+def test_arrays_can_be_passed_as_expected_arguments():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).save(numpy.array([1, 2]), values=numpy.array([3])).returns("saved")
+
+    assert_that(storage.save(numpy.array([1, 2]), values=numpy.array([3])), equal_to("saved"))
+    assert_raises(UnexpectedInvocationError, lambda: storage.save(numpy.array([1, 3]), values=numpy.array([3])))
+
+def test_unexpected_invocation_error_describes_array_arguments():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).save(numpy.array([1, 2]))
+
+    assert_raises_str(UnexpectedInvocationError,
+"""Unexpected invocation: storage.save(array([1, 3]))
+The following expectations on storage.save did not match:
+    storage.save(array equal to array([1, 2]) [was 3 at index (1,), expected 2])""",
+                      lambda: storage.save(numpy.array([1, 3])))
+
+def test_arrays_do_not_match_plain_values():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).save(None)
+
+    assert_raises_str(UnexpectedInvocationError,
+"""Unexpected invocation: storage.save(array([0., 0.]))
+The following expectations on storage.save did not match:
+    storage.save(None [was array([0., 0.])])""",
+                      lambda: storage.save(numpy.zeros(2)))
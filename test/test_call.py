@@ -1,9 +1,14 @@
-from precisely import assert_that, equal_to
+from precisely import assert_that, equal_to, Matcher
+from precisely.results import matched, unmatched
 
 from funk.error import FunkyError
+from funk.call import Arguments
 from funk.call import Call
+from funk.call import Mismatch
 from funk.call import IntegerCallCount
-from .util import assert_raises_str
+from funk.call import InfiniteCallCount
+from funk.call import LockedCallCount
+from .util import assert_raises, assert_raises_str
 
 def test_has_name_returns_true_if_passed_name_matches_method_name():
     call = Call('save')
@@ -190,3 +195,108 @@ def test_mismatch_description_shows_both_mismatching_positional_and_keyword_argu
         ''.join(mismatch_description),
         equal_to("save('eggs' [was 'duck'],\n     'potatoes' [matched],\n     fruit='banana' [was 'coconut'],\n     vegetable='cucumber' [matched])"),
     )
+
+def test_match_returns_none_if_arguments_are_accepted():
+    call = Call('save').with_args("apple")
+    assert call.match(["apple"], {}) is None
+
+def test_match_returns_mismatch_that_is_described_only_when_converted_to_string():
+    class CountingMatcher(Matcher):
+        def __init__(self):
+            self.describe_count = 0
+
+        def match(self, actual):
+            return unmatched("was {0!r}".format(actual))
+
+        def describe(self):
+            self.describe_count += 1
+            return "<counting>"
+
+    matcher = CountingMatcher()
+    call = Call('save').with_args(matcher)
+    mismatch = call.match(["coconut"], {})
+    assert_that(matcher.describe_count, equal_to(0))
+    assert_that(str(mismatch), equal_to("save(<counting> [was 'coconut'])"))
+
+def test_arguments_compare_plain_values_using_equality():
+    class Anything(object):
+        def __eq__(self, other):
+            return True
+
+    arguments = Arguments((Anything(), ), {"key": Anything()})
+    assert arguments.mismatch(("apple", ), {"key": "word"}) is None
+
+def test_arguments_only_use_matchers_when_plain_values_are_equal():
+    class CountingMatcher(Matcher):
+        def __init__(self):
+            self.match_count = 0
+
+        def match(self, actual):
+            self.match_count += 1
+            return matched()
+
+        def describe(self):
+            return "<counting>"
+
+    matcher = CountingMatcher()
+    arguments = Arguments(("apple", matcher), {"key": "word"})
+
+    assert_that(arguments.mismatch(("apple", "banana"), {"key": "other"}), equal_to(Mismatch.ARGUMENTS))
+    assert_that(arguments.mismatch(("coconut", "banana"), {"key": "word"}), equal_to(Mismatch.ARGUMENTS))
+    assert_that(matcher.match_count, equal_to(0))
+    assert arguments.mismatch(("apple", "banana"), {"key": "word"}) is None
+    assert_that(matcher.match_count, equal_to(1))
+
+def test_arguments_check_number_of_positional_arguments_and_keyword_names():
+    arguments = Arguments(("apple", ), {"key": "word"})
+
+    assert_that(arguments.mismatch((), {"key": "word"}), equal_to(Mismatch.WRONG_NUMBER_OF_POSITIONAL_ARGUMENTS))
+    assert_that(arguments.mismatch(("apple", ), {}), equal_to(Mismatch.MISSING_KEYWORD_ARGUMENTS))
+    assert_that(arguments.mismatch(("apple", ), {"key": "word", "other": 1}), equal_to(Mismatch.UNEXPECTED_KEYWORD_ARGUMENTS))
+
+def test_claiming_integer_call_count_decrements_until_none_remaining():
+    call_count = IntegerCallCount(2)
+    assert call_count.claim()
+    assert call_count.claim()
+    assert not call_count.claim()
+    assert call_count.is_satisfied()
+
+def test_locked_call_count_claims_under_lock():
+    class RecordingLock(object):
+        def __init__(self):
+            self.acquisitions = 0
+
+        def __enter__(self):
+            self.acquisitions += 1
+
+        def __exit__(self, *args):
+            pass
+
+    lock = RecordingLock()
+    call_count = LockedCallCount(IntegerCallCount(1), lock)
+    assert call_count.claim()
+    assert not call_count.claim()
+    assert call_count.is_satisfied()
+    assert_that(lock.acquisitions, equal_to(2))
+
+def test_awaitable_cannot_be_awaited_twice():
+    call = Call('save').returns_async("saved")
+    awaitable = call()
+    assert_raises_str(StopIteration, "saved", lambda: awaitable.__await__().send(None))
+    assert_raises_str(RuntimeError, "cannot reuse already awaited awaitable", lambda: awaitable.__await__().send(None))
+
+def test_call_has_unawaited_results_until_awaitable_is_awaited():
+    call = Call('save').returns_async("saved")
+    assert not call.has_unawaited_results()
+    awaitable = call()
+    assert call.has_unawaited_results()
+    assert_raises(StopIteration, lambda: awaitable.__await__().send(None))
+    assert not call.has_unawaited_results()
+
+def test_infinite_call_counts_are_shared():
+    assert InfiniteCallCount() is InfiniteCallCount()
+
+def test_calls_do_not_have_instance_dicts():
+    call = Call('save').with_args(1, key="value")
+    assert not hasattr(call, "__dict__")
+    assert not hasattr(call._arguments, "__dict__")
@@ -0,0 +1,175 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from precisely import assert_that, equal_to
+
+import funk
+from funk import FunkyError, UnexpectedInvocationError
+from funk.cassette import record, replay
+from .util import assert_raises, assert_raises_str
+
+
+class Storage(object):
+    description = "storage"
+
+    def __init__(self):
+        self.saved = []
+
+    def save(self, value, key=None):
+        self.saved.append(value)
+        return len(self.saved)
+
+    def load(self, key):
+        raise KeyError(key)
+
+    def __call__(self, value):
+        return value * 2
+
+
+def test_recorded_return_values_are_replayed(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        storage.save("a")
+        storage.save("b", key=2)
+
+    mocks = funk.Mocks()
+    storage = replay(mocks, path, name="storage")
+
+    assert_that(storage.save("b", key=2), equal_to(2))
+    assert_that(storage.save("a"), equal_to(1))
+    assert_that(storage.save("a"), equal_to(1))
+    mocks.verify()
+
+def test_recorded_errors_are_replayed(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        assert_raises(KeyError, lambda: storage.load("a"))
+
+    storage = replay(funk.Mocks(), path, name="storage")
+
+    assert_raises_str(KeyError, "'a'", lambda: storage.load("a"))
+
+def test_invocations_of_recorded_object_itself_are_replayed(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        storage(4)
+
+    storage = replay(funk.Mocks(), path, name="storage")
+
+    assert_that(storage(4), equal_to(8))
+
+def test_attributes_that_are_not_callable_are_not_recorded(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        assert_that(storage.description, equal_to("storage"))
+
+    storage = replay(funk.Mocks(), path, name="storage")
+
+    assert_raises(AttributeError, lambda: storage.description)
+
+def test_first_recorded_outcome_for_arguments_is_replayed(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        storage.save("a")
+        storage.save("a")
+
+    storage = replay(funk.Mocks(), path, name="storage")
+
+    assert_that(storage.save("a"), equal_to(1))
+
+def test_arguments_that_were_not_recorded_are_unexpected(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        storage.save("a")
+
+    storage = replay(funk.Mocks(), path, name="storage")
+
+    assert_raises_str(
+        UnexpectedInvocationError,
+        """Unexpected invocation: storage.save('b')
+The following expectations on storage.save did not match:
+    storage.save(<table with 1 rows>) [no row for arguments]""",
+        lambda: storage.save("b"),
+    )
+
+def test_replayed_mock_uses_base_as_spec(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        storage.save("a")
+
+    storage = replay(funk.Mocks(), path, base=Storage)
+
+    assert_that(storage.save("a"), equal_to(1))
+    assert_raises(AttributeError, lambda: storage.delete)
+
+def test_many_recorded_invocations_can_be_replayed(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        for value in range(0, 1000):
+            storage.save(value)
+
+    storage = replay(funk.Mocks(), path, name="storage")
+
+    assert_that([storage.save(value) for value in range(0, 1000)], equal_to(list(range(1, 1001))))
+
+def test_files_that_are_not_cassettes_are_rejected(tmp_path):
+    path = tmp_path / "storage.cassette"
+    path.write_bytes(b"not a cassette" * 10)
+
+    assert_raises(ValueError, lambda: replay(funk.Mocks(), str(path)))
+
+def test_sets_and_dicts_are_replayed_regardless_of_order(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    with record(Storage(), path) as storage:
+        storage.save(frozenset(["a", "b", "c"]), key={"x": 1, "y": {2, 3}})
+
+    storage = replay(funk.Mocks(), path, name="storage")
+
+    assert_that(storage.save(frozenset(["c", "b", "a"]), key={"y": {3, 2}, "x": 1}), equal_to(1))
+
+def test_arguments_that_cannot_be_replayed_are_rejected_when_recording(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    target = Storage()
+    with record(target, path) as storage:
+        assert_raises_str(FunkyError,
+            "Cannot record arguments of type Storage: only None, bool, int, float, complex, "
+            "str, bytes, and tuples, lists, dicts and sets of them can be recorded",
+            lambda: storage.save([Storage()]))
+
+    assert_that(target.saved, equal_to([]))
+
+def _run_with_hash_seed(hash_seed, source):
+    environment = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(source)],
+        stdout=subprocess.PIPE,
+        env=environment,
+        universal_newlines=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+def test_cassettes_recorded_in_one_process_are_replayed_in_another(tmp_path):
+    path = str(tmp_path / "storage.cassette")
+    _run_with_hash_seed(1, """
+        from funk.cassette import record
+
+        class Storage(object):
+            def get(self, names, options):
+                return len(names)
+
+        with record(Storage(), %r) as storage:
+            storage.get(frozenset("abcdefgh"), {"b": 2, "a": 1})
+    """ % path)
+
+    output = _run_with_hash_seed(2, """
+        import funk
+        from funk.cassette import replay
+
+        storage = replay(funk.Mocks(), %r, name="storage")
+        print(storage.get(frozenset("hgfedcba"), {"a": 1, "b": 2}))
+    """ % path)
+
+    assert_that(output, equal_to("8"))
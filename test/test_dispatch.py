@@ -0,0 +1,77 @@
+from precisely import assert_that, equal_to, contains_exactly, instance_of
+
+from funk.call import Call
+from funk.dispatch import CallIndex, is_plain_literal
+
+
+def test_candidates_for_literal_arguments_are_found_by_hashing():
+    index = CallIndex()
+    calls = [Call("save").with_args(value) for value in range(0, 1000)]
+    for call in calls:
+        index.append(call)
+
+    assert_that(index.candidates((42, ), {}), contains_exactly(calls[42]))
+    assert_that(index.candidates((1000, ), {}), contains_exactly())
+
+def test_candidates_are_partitioned_by_keyword_argument_names():
+    index = CallIndex()
+    by_position = Call("save").with_args(1)
+    by_keyword = Call("save").with_args(value=1)
+    index.append(by_position)
+    index.append(by_keyword)
+
+    assert_that(index.candidates((1, ), {}), contains_exactly(by_position))
+    assert_that(index.candidates((), {"value": 1}), contains_exactly(by_keyword))
+    assert_that(index.candidates((), {"other": 1}), contains_exactly())
+
+def test_candidates_include_matchers_and_wildcards_in_definition_order():
+    index = CallIndex()
+    literal = Call("save").with_args(1)
+    matcher = Call("save").with_args(instance_of(int))
+    wildcard = Call("save")
+    other_literal = Call("save").with_args(2)
+    repeated_literal = Call("save").with_args(1)
+    for call in [literal, matcher, wildcard, other_literal, repeated_literal]:
+        index.append(call)
+
+    assert_that(
+        index.candidates((1, ), {}),
+        contains_exactly(literal, matcher, wildcard, repeated_literal),
+    )
+
+def test_candidates_include_all_expectations_of_shape_when_actual_argument_is_not_plain_literal():
+    class Anything(object):
+        def __eq__(self, other):
+            return True
+
+    index = CallIndex()
+    first = Call("save").with_args(1)
+    second = Call("save").with_args(2)
+    index.append(first)
+    index.append(second)
+
+    assert_that(index.candidates((Anything(), ), {}), contains_exactly(first, second))
+
+def test_index_is_rebuilt_when_arguments_of_expectation_are_changed():
+    index = CallIndex()
+    call = Call("save")
+    index.append(call)
+    assert_that(index.candidates((1, ), {}), contains_exactly(call))
+
+    call.with_args(2)
+
+    assert_that(index.candidates((1, ), {}), contains_exactly())
+    assert_that(index.candidates((2, ), {}), contains_exactly(call))
+
+def test_tuples_of_builtin_values_are_plain_literals():
+    assert_that(is_plain_literal((1, "two", (3.0, None))), equal_to(True))
+    assert_that(is_plain_literal((1, [2])), equal_to(False))
+    assert_that(is_plain_literal(object()), equal_to(False))
+
+def test_cleared_index_has_no_candidates():
+    index = CallIndex()
+    index.append(Call("save").with_args(1))
+    index.clear()
+
+    assert_that(list(index.candidates((1, ), {})), equal_to([]))
+    assert_that(len(index), equal_to(0))
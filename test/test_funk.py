@@ -1,4 +1,11 @@
-from precisely import equal_to
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+
+from precisely import equal_to, Matcher
+from precisely.results import matched
 
 import funk
 from funk import FunkyError
@@ -7,6 +14,7 @@ from funk import allows
 from funk import expects_call
 from funk import allows_call
 from funk import UnexpectedInvocationError
+from funk.call import IntegerCallCount
 from .util import assert_raises, assert_raises_str
 
 
@@ -527,3 +535,627 @@ def test_can_mock_methods_used_internally_by_mock(mocks):
     based_mock = mocks.mock(UserRepository)
     allows(based_mock)._base
 
+
+@funk.with_mocks
+def test_first_matching_expectation_is_used_when_there_are_many_literal_expectations(mocks):
+    mock = mocks.mock()
+    expects(mock).save(500).returns("first")
+    for value in range(0, 1000):
+        allows(mock).save(value).returns(value * 2)
+
+    assert mock.save(999) == 1998
+    assert mock.save(500) == "first"
+    assert mock.save(500) == 1000
+    assert_raises(UnexpectedInvocationError, lambda: mock.save(1000))
+
+@funk.with_mocks
+def test_satisfied_literal_expectations_fall_through_to_later_expectations(mocks):
+    mock = mocks.mock()
+    expects(mock).save("a").returns(1)
+    allows(mock).save(equal_to("a")).returns(2)
+
+    assert mock.save("a") == 1
+    assert mock.save("a") == 2
+
+@funk.with_mocks
+def test_argument_matchers_are_evaluated_once_per_successful_invocation(mocks):
+    class CountingMatcher(Matcher):
+        def __init__(self):
+            self.match_count = 0
+
+        def match(self, actual):
+            self.match_count += 1
+            return matched()
+
+        def describe(self):
+            return "<counting>"
+
+    matcher = CountingMatcher()
+    mock = mocks.mock()
+    expects(mock).save(matcher).returns("saved")
+
+    assert mock.save("apple") == "saved"
+    assert matcher.match_count == 1
+
+def test_expectations_on_thread_safe_mocks_are_each_used_once_across_threads():
+    mocks = funk.Mocks(thread_safe=True)
+    mock = mocks.mock(name="counter")
+    for index in range(0, 1000):
+        expects(mock).next().returns(index)
+    allows(mock).reset()
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda index: (mock.reset(), mock.next())[1], range(0, 1000)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert sorted(results) == list(range(0, 1000))
+    assert_raises(UnexpectedInvocationError, lambda: mock.next())
+    mocks.verify()
+
+def test_thread_safe_mocks_can_be_used_in_sequences():
+    mocks = funk.Mocks(thread_safe=True)
+    log = mocks.mock(name="log")
+    ordering = mocks.sequence()
+    expects(log).write("a").in_sequence(ordering)
+    expects(log).close().in_sequence(ordering)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(lambda: log.write("a")).result()
+        executor.submit(lambda: log.close()).result()
+
+    mocks.verify()
+
+@funk.with_mocks
+def test_returns_async_returns_awaitable_that_produces_value(mocks):
+    storage = mocks.mock(name="storage")
+    allows(storage).names.returns_async(["a", "b"])
+
+    async def fetch():
+        return await storage.names()
+
+    assert asyncio.run(fetch()) == ["a", "b"]
+
+@funk.with_mocks
+def test_raises_async_returns_awaitable_that_raises_error(mocks):
+    error = RuntimeError("Could not connect")
+    storage = mocks.mock(name="storage")
+    allows(storage).names.raises_async(error)
+
+    async def fetch():
+        return await storage.names()
+
+    assert_raises(RuntimeError, lambda: asyncio.run(fetch()))
+
+@funk.with_mocks
+def test_methods_that_are_coroutine_functions_on_base_return_awaitables(mocks):
+    class FileStorage(object):
+        async def names(self):
+            pass
+
+        async def delete(self):
+            pass
+
+    storage = mocks.mock(FileStorage)
+    allows(storage).names.returns(["a", "b"])
+    allows(storage).delete.raises(RuntimeError("Could not connect"))
+
+    assert asyncio.run(_await(storage.names())) == ["a", "b"]
+    assert_raises(RuntimeError, lambda: asyncio.run(_await(storage.delete())))
+
+def test_many_awaitables_can_be_awaited_concurrently():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).names.returns_async(["a"])
+
+    async def fetch_all():
+        return await asyncio.gather(*(
+            _await(storage.names())
+            for index in range(0, 1000)
+        ))
+
+    assert asyncio.run(fetch_all()) == [["a"]] * 1000
+    mocks.verify()
+
+def test_verify_raises_assertion_error_if_awaitable_is_never_awaited():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).names.returns_async(["a"])
+
+    storage.names()
+
+    assert_raises_str(AssertionError,
+                      "Not all awaitables were awaited. Awaitable returned by call: storage.names",
+                      mocks.verify)
+
+def test_awaitables_can_be_run_as_tasks():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).names.returns_async(["a"])
+    allows(storage).delete.raises_async(RuntimeError("Could not connect"))
+
+    async def fetch():
+        task = asyncio.create_task(storage.names())
+        return await task
+
+    assert asyncio.run(fetch()) == ["a"]
+    assert asyncio.run(storage.names()) == ["a"]
+    assert_raises(RuntimeError, lambda: asyncio.run(storage.delete()))
+    mocks.verify()
+
+def test_awaitables_are_coroutines():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).names.returns_async(["a"])
+
+    awaitable = storage.names()
+
+    assert asyncio.iscoroutine(awaitable)
+    asyncio.run(_await(awaitable))
+
+def test_cancelled_tasks_do_not_run_action():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    expects(storage).save.returns_async(None)
+
+    async def cancel():
+        task = asyncio.create_task(storage.save())
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return "cancelled"
+
+    assert asyncio.run(cancel()) == "cancelled"
+    mocks.verify()
+
+def test_awaitables_are_counted_across_threads():
+    mocks = funk.Mocks(thread_safe=True)
+    storage = mocks.mock(name="storage")
+    allows(storage).names.returns_async(["a"])
+
+    def fetch(index):
+        return asyncio.run(_await(storage.names()))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(fetch, range(0, 200)))
+
+    assert results == [["a"]] * 200
+    mocks.verify()
+
+async def _await(awaitable):
+    return await awaitable
+
+def test_template_setup_is_run_once_and_each_use_gets_independent_copies():
+    setup_calls = []
+
+    @funk.template
+    def storage_mocks(mocks):
+        setup_calls.append(mocks)
+        storage = mocks.mock(name="storage")
+        expects(storage).save("a").returns("saved")
+        return storage
+
+    for index in range(0, 3):
+        mocks = funk.Mocks()
+        storage = storage_mocks(mocks)
+        assert storage.save("a") == "saved"
+        assert_raises(UnexpectedInvocationError, lambda: storage.save("a"))
+        mocks.verify()
+
+    assert len(setup_calls) == 1
+
+def test_copies_from_template_are_verified_by_mocks_they_are_added_to():
+    @funk.template
+    def storage_mocks(mocks):
+        storage = mocks.mock(name="storage")
+        expects(storage).save("a")
+        return storage
+
+    mocks = funk.Mocks()
+    storage_mocks(mocks)
+
+    assert_raises_str(AssertionError,
+                      "Not all expectations were satisfied. Expected call: storage.save('a')",
+                      mocks.verify)
+
+def test_mocks_in_result_of_template_are_replaced_by_copies():
+    class FileStorage(object):
+        def names(self):
+            pass
+
+    @funk.template
+    def storage_mocks(mocks):
+        storage = mocks.mock(FileStorage)
+        log = mocks.mock(name="log")
+        factory = mocks.mock(name="factory")
+        allows(storage).names().returns(["a"])
+        allows(factory).create().returns(storage)
+        return {"storage": storage, "others": (log, [factory])}
+
+    mocks = funk.Mocks()
+    result = storage_mocks(mocks)
+    storage = result["storage"]
+    log, (factory, ) = result["others"]
+
+    assert storage.names() == ["a"]
+    assert factory.create() is storage
+    assert mocks._mocks == [storage, log, factory]
+
+def test_sequences_are_copied_for_each_use_of_template():
+    @funk.template
+    def log_mocks(mocks):
+        log = mocks.mock(name="log")
+        ordering = mocks.sequence()
+        expects(log).write("a").in_sequence(ordering)
+        expects(log).close().in_sequence(ordering)
+        return log
+
+    first_log = log_mocks(funk.Mocks())
+    first_log.write("a")
+
+    second_log = log_mocks(funk.Mocks())
+    assert_raises_str(AssertionError,
+                      "Invocation out of order. Expected log.write('a'), but got log.close().",
+                      lambda: second_log.close())
+
+def test_mocked_method_is_same_object_on_each_access():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).save
+
+    assert storage.save is storage.save
+
+def test_reset_forgets_mocks_created_before_reset():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    expects(storage).save()
+
+    mocks.reset()
+
+    mocks.verify()
+
+def test_pooled_mocks_reuse_mocks_created_before_reset_without_their_expectations():
+    class Storage(object):
+        def save(self):
+            pass
+
+    mocks = funk.Mocks(pooled=True)
+    original = mocks.mock(name="storage")
+    expects(original).save()
+
+    mocks.reset()
+    storage = mocks.mock(Storage, name="database")
+
+    assert storage is original
+    assert_raises_str(UnexpectedInvocationError,
+"""Unexpected invocation: database.save()
+The following expectations on database.save did not match:
+    No expectations set.""",
+        lambda: storage.save())
+    assert_raises_str(AssertionError,
+        "Method 'load' is not defined on type object 'Storage'",
+        lambda: allows(storage).load)
+    mocks.verify()
+
+def test_pooled_mocks_do_not_keep_attributes_set_before_reset():
+    mocks = funk.Mocks(pooled=True)
+    original = mocks.mock(name="a")
+    original.stale = 1
+
+    mocks.reset()
+    storage = mocks.mock(name="b")
+
+    assert storage is original
+    assert_raises(AttributeError, lambda: storage.stale)
+
+def test_pooled_sequences_are_reset():
+    mocks = funk.Mocks(pooled=True)
+    ordering = mocks.sequence()
+    storage = mocks.mock(name="storage")
+    expects(storage).save().in_sequence(ordering)
+    storage.save()
+
+    mocks.reset()
+    storage = mocks.mock(name="storage")
+    sequence = mocks.sequence()
+    expects(storage).load().in_sequence(sequence)
+    expects(storage).save().in_sequence(sequence)
+
+    assert sequence is ordering
+    assert_raises_str(AssertionError,
+        "Invocation out of order. Expected storage.load(), but got storage.save().",
+        lambda: storage.save())
+
+def test_table_returns_value_from_row_with_matching_arguments():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).load.table([
+        (("a", ), 1),
+        (("b", ), {"version": 2}, 2),
+        (("a", ), 3),
+    ])
+
+    assert storage.load("a") == 1
+    assert storage.load("b", version=2) == 2
+
+def test_table_rows_can_be_read_from_iterator():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).load.table(([name], name.upper()) for name in ["a", "b"])
+
+    assert storage.load("b") == "B"
+
+def test_error_is_raised_if_table_has_no_row_for_arguments():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).load.table([(("a", ), 1), (("b", ), 2)])
+
+    assert_raises_str(UnexpectedInvocationError,
+"""Unexpected invocation: storage.load('c')
+The following expectations on storage.load did not match:
+    storage.load(<table with 2 rows>) [no row for arguments]""",
+        lambda: storage.load("c"))
+    assert_raises(UnexpectedInvocationError, lambda: storage.load("a", version=1))
+    assert_raises(UnexpectedInvocationError, lambda: storage.load(["a"]))
+
+def test_expectations_before_table_take_precedence():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).load("a").returns(0)
+    allows(storage).load.table([(("a", ), 1), (("b", ), 2)])
+
+    assert storage.load("a") == 0
+    assert storage.load("b") == 2
+
+def test_returns_from_returns_next_value_from_iterable_on_each_invocation():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).next_page.returns_from(iter(["a", "b"]))
+
+    assert storage.next_page() == "a"
+    assert storage.next_page() == "b"
+    assert_raises_str(UnexpectedInvocationError,
+"""Unexpected invocation: storage.next_page()
+The following expectations on storage.next_page did not match:
+    storage.next_page [expectation has already been satisfied]""",
+        lambda: storage.next_page())
+
+def test_returns_from_reads_iterable_lazily():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    read = []
+
+    def pages():
+        for page in ["a", "b"]:
+            read.append(page)
+            yield page
+
+    allows(storage).next_page.returns_from(pages())
+    assert read == []
+    storage.next_page()
+    assert read == ["a"]
+
+def test_expectation_with_returns_from_is_satisfied_when_iterable_is_exhausted():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    expects(storage).next_page.returns_from(["a", "b"])
+
+    storage.next_page()
+    assert_raises_str(AssertionError,
+        "Not all expectations were satisfied. Expected call: storage.next_page",
+        lambda: mocks.verify())
+    storage.next_page()
+    mocks.verify()
+
+def test_expectation_with_returns_from_is_satisfied_after_count_invocations():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    expects(storage).next_page.returns_from(itertools.count(), count=2)
+
+    assert storage.next_page() == 0
+    assert storage.next_page() == 1
+    mocks.verify()
+    assert_raises(UnexpectedInvocationError, lambda: storage.next_page())
+
+def test_later_expectations_are_used_once_iterable_is_exhausted():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).next_page.returns_from(["a"])
+    allows(storage).next_page.returns(None)
+
+    assert storage.next_page() == "a"
+    assert storage.next_page() is None
+
+def test_each_value_from_returns_from_is_returned_once_when_called_from_many_threads():
+    mocks = funk.Mocks(thread_safe=True)
+    storage = mocks.mock(name="storage")
+    expects(storage).next_page.returns_from(range(0, 1000))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pages = list(executor.map(lambda index: storage.next_page(), range(0, 1000)))
+
+    assert sorted(pages) == list(range(0, 1000))
+    mocks.verify()
+
+def test_generator_from_returns_from_on_allowed_call_is_not_run_concurrently():
+    running = []
+    most_running = [0]
+
+    def pages():
+        for index in range(0, 2000):
+            running.append(index)
+            most_running[0] = max(most_running[0], len(running))
+            # Give other threads the chance to resume the generator
+            time.sleep(0)
+            running.pop()
+            yield index
+
+    mocks = funk.Mocks(thread_safe=True)
+    storage = mocks.mock(name="storage")
+    allows(storage).next_page.returns_from(pages())
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pages = list(executor.map(lambda index: storage.next_page(), range(0, 2000)))
+
+    assert sorted(pages) == list(range(0, 2000))
+    assert most_running[0] == 1
+
+def test_verify_reports_first_unsatisfied_call_on_first_mock_in_order_of_methods():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    cache = mocks.mock(name="cache")
+    expects(storage).save(1)
+    expects(cache).clear()
+    expects(storage).load()
+    expects(storage).save(2)
+
+    storage.save(1)
+
+    assert_raises_str(AssertionError,
+        "Not all expectations were satisfied. Expected call: storage.save(2)",
+        lambda: mocks.verify())
+
+def test_verify_does_not_check_calls_that_have_been_satisfied():
+    checked = []
+
+    class RecordingCallCount(IntegerCallCount):
+        def is_satisfied(self):
+            checked.append(self)
+            return super(RecordingCallCount, self).is_satisfied()
+
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    object.__getattribute__(storage, "_mocked_calls").add_method_call("save", RecordingCallCount(1))
+    object.__getattribute__(storage, "_mocked_calls").add_method_call("load", RecordingCallCount(1))
+    storage.save()
+    storage.load()
+    del checked[:]
+
+    mocks.verify()
+
+    assert checked == []
+
+def test_mocks_with_matcher_cache_only_run_matchers_once_per_argument():
+    class CountingMatcher(Matcher):
+        def __init__(self):
+            self.match_count = 0
+
+        def match(self, actual):
+            self.match_count += 1
+            return matched()
+
+        def describe(self):
+            return "<counting>"
+
+    mocks = funk.Mocks(matcher_cache=funk.MatcherCache())
+    storage = mocks.mock(name="storage")
+    matcher = CountingMatcher()
+    allows(storage).save(matcher)
+    payload = {"key": "value"}
+
+    storage.save(payload)
+    storage.save(payload)
+    storage.save({"key": "value"})
+
+    assert matcher.match_count == 2
+
+def test_matcher_cache_is_cleared_when_mocks_are_reset():
+    cache = funk.MatcherCache()
+    mocks = funk.Mocks(matcher_cache=cache)
+    storage = mocks.mock(name="storage")
+    allows(storage).save(equal_to(1))
+    storage.save(1)
+
+    mocks.reset()
+
+    assert len(cache) == 0
+
+def test_unexpected_invocation_error_message_is_only_built_when_converted_to_string():
+    described = []
+
+    class Payload(object):
+        def __repr__(self):
+            described.append(self)
+            return "<payload>"
+
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).save(1)
+
+    try:
+        storage.save(Payload())
+    except UnexpectedInvocationError as error:
+        assert described == []
+        assert "Unexpected invocation: storage.save(<payload>)" in str(error)
+
+def test_unexpected_invocation_error_args_and_repr_hold_message():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+    allows(storage).save(1)
+
+    try:
+        storage.save(2)
+    except UnexpectedInvocationError as error:
+        message = """Unexpected invocation: storage.save(2)
+The following expectations on storage.save did not match:
+    storage.save(1 [was 2])"""
+        assert error.args == (message, )
+        assert repr(error) == "UnexpectedInvocationError(%r)" % message
+
+def test_repr_limit_truncates_arguments_and_descriptions_in_unexpected_invocation_errors():
+    mocks = funk.Mocks(repr_limit=10)
+    storage = mocks.mock(name="storage")
+    allows(storage).save(b"a" * 1000)
+    allows(storage).save(equal_to("b" * 1000))
+
+    assert_raises_str(UnexpectedInvocationError,
+"""Unexpected invocation: storage.save(b'cccccccc...)
+The following expectations on storage.save did not match:
+    storage.save(b'aaaaaaaa... [was b'cccccccc...])
+    storage.save('bbbbbbbbb... [was b'cccc...])""",
+                      lambda: storage.save(b"c" * 1000))
+
+def test_repr_limit_truncates_arguments_when_verifying():
+    mocks = funk.Mocks(repr_limit=10)
+    storage = mocks.mock(name="storage")
+    expects(storage).save("a" * 1000)
+
+    assert_raises_str(AssertionError,
+        "Not all expectations were satisfied. Expected call: storage.save('aaaaaaaaa...)",
+        lambda: mocks.verify())
+
+def test_repr_limit_truncates_arguments_when_converting_calls_to_strings():
+    mocks = funk.Mocks(repr_limit=10)
+    storage = mocks.mock(name="storage")
+    call = expects(storage).save("a" * 100000)
+
+    assert str(call) == "storage.save('aaaaaaaaa...)"
+
+def test_repr_limit_truncates_arguments_in_sequence_errors():
+    mocks = funk.Mocks(repr_limit=10)
+    ordered = mocks.sequence()
+    storage = mocks.mock(name="storage")
+    expects(storage).save("a" * 100000).in_sequence(ordered)
+    expects(storage).load("b" * 100000).in_sequence(ordered)
+
+    assert_raises_str(AssertionError,
+        "Invocation out of order. Expected storage.save('aaaaaaaaa...), but got storage.load('bbbbbbbbb...).",
+        lambda: storage.load("b" * 100000))
+
+def test_mocks_can_be_named_using_values_that_are_not_strings():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name=42)
+    expects(storage).save()
+    expects_call(storage)
+
+    assert_raises_str(AssertionError,
+        "Not all expectations were satisfied. Expected call: 42.save()",
+        lambda: mocks.verify())
+    storage.save()
+    assert_raises_str(AssertionError,
+        "Not all expectations were satisfied. Expected call: 42",
+        lambda: mocks.verify())
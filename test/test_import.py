@@ -0,0 +1,51 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from precisely import assert_that, equal_to, less_than
+
+
+_LAZY_MODULES = ["precisely", "inspect", "threading", "multiprocessing", "mmap", "numpy"]
+
+
+def _import_funk():
+    # Importing in a new interpreter is the only way to see the cost of the
+    # first import. Modules already imported during interpreter startup are
+    # excluded from the modules imported by funk.
+    result = subprocess.run(
+        [
+            sys.executable, "-X", "importtime", "-c",
+            "import json, sys; before = set(sys.modules); import funk; "
+            "print(json.dumps(sorted(set(sys.modules) - before)))",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    modules = json.loads(result.stdout)
+    match = re.search(r"^import time:\s*\d+ \|\s*(\d+) \| funk$", result.stderr, re.MULTILINE)
+    return modules, int(match.group(1))
+
+
+def test_importing_funk_does_not_import_modules_that_are_only_needed_later():
+    modules = _import_funk()[0]
+    lazy_modules_imported = [
+        module for module in modules
+        if module.split(".")[0] in _LAZY_MODULES
+    ]
+    assert_that(lazy_modules_imported, equal_to([]))
+
+
+# Importing funk takes around 40 ms on a typical machine. The default budget
+# leaves room for slow machines, and can be tightened by setting
+# FUNK_IMPORT_TIME_BUDGET_US.
+_DEFAULT_IMPORT_TIME_BUDGET_US = 100000
+
+
+def test_importing_funk_takes_less_than_budget():
+    budget = int(os.environ.get("FUNK_IMPORT_TIME_BUDGET_US", _DEFAULT_IMPORT_TIME_BUDGET_US))
+    import_times = [_import_funk()[1] for index in range(0, 3)]
+    assert_that(min(import_times), less_than(budget))
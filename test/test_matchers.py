@@ -0,0 +1,62 @@
+from precisely import assert_that, equal_to, Matcher
+from precisely.results import matched, unmatched
+
+from funk.matchers import MatcherCache
+from .util import assert_raises
+
+
+class CountingMatcher(Matcher):
+    def __init__(self, is_match=True):
+        self._is_match = is_match
+        self.match_count = 0
+
+    def match(self, actual):
+        self.match_count += 1
+        return matched() if self._is_match else unmatched("no")
+
+    def describe(self):
+        return "<counting>"
+
+
+def test_matcher_cache_returns_result_of_matcher():
+    cache = MatcherCache()
+
+    assert_that(cache.is_match(CountingMatcher(True), []), equal_to(True))
+    assert_that(cache.is_match(CountingMatcher(False), []), equal_to(False))
+
+def test_matcher_cache_only_runs_matcher_once_for_same_argument():
+    cache = MatcherCache()
+    matcher = CountingMatcher()
+    value = []
+
+    cache.is_match(matcher, value)
+    cache.is_match(matcher, value)
+
+    assert_that(matcher.match_count, equal_to(1))
+
+def test_matcher_cache_runs_matcher_for_each_argument_object():
+    cache = MatcherCache()
+    matcher = CountingMatcher()
+
+    cache.is_match(matcher, [])
+    cache.is_match(matcher, [])
+
+    assert_that(matcher.match_count, equal_to(2))
+
+def test_matcher_cache_evicts_least_recently_used_results():
+    cache = MatcherCache(capacity=2)
+    matcher = CountingMatcher()
+    first, second, third = [], [], []
+
+    cache.is_match(matcher, first)
+    cache.is_match(matcher, second)
+    cache.is_match(matcher, first)
+    cache.is_match(matcher, third)
+    cache.is_match(matcher, first)
+    cache.is_match(matcher, second)
+
+    assert_that(len(cache), equal_to(2))
+    assert_that(matcher.match_count, equal_to(4))
+
+def test_matcher_cache_capacity_must_be_positive():
+    assert_raises(ValueError, lambda: MatcherCache(capacity=0))
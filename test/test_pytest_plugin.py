@@ -0,0 +1,95 @@
+import pytest
+
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture
+def run_pytest(pytester, monkeypatch):
+    # Load the plugin explicitly, whether or not Funk has been installed
+    # with its entry point
+    monkeypatch.setenv("PYTEST_DISABLE_PLUGIN_AUTOLOAD", "1")
+
+    def run_pytest(source):
+        pytester.makepyfile(source)
+        return pytester.runpytest("-p", "funk.pytest_plugin")
+
+    return run_pytest
+
+
+def test_mocks_fixture_passes_when_expectations_are_satisfied(run_pytest):
+    result = run_pytest("""
+        from funk import expects
+
+        def test_save(mocks):
+            storage = mocks.mock(name="storage")
+            expects(storage).save()
+            storage.save()
+    """)
+    result.assert_outcomes(passed=1)
+
+
+def test_mocks_fixture_is_verified_on_teardown(run_pytest):
+    result = run_pytest("""
+        from funk import expects
+
+        def test_save(mocks):
+            storage = mocks.mock(name="storage")
+            expects(storage).save()
+    """)
+    result.assert_outcomes(passed=1, errors=1)
+    result.stdout.fnmatch_lines(["*Not all expectations were satisfied. Expected call: storage.save()*"])
+
+
+def test_mocks_fixture_is_not_verified_when_test_fails(run_pytest):
+    result = run_pytest("""
+        from funk import expects
+
+        def test_save(mocks):
+            storage = mocks.mock(name="storage")
+            expects(storage).save()
+            assert False
+    """)
+    result.assert_outcomes(failed=1)
+
+
+def test_each_test_has_its_own_mocks(run_pytest):
+    result = run_pytest("""
+        from funk import expects
+
+        def test_first(mocks):
+            storage = mocks.mock(name="storage")
+            expects(storage).save()
+            storage.save()
+
+        def test_second(mocks):
+            pass
+    """)
+    result.assert_outcomes(passed=2)
+
+
+def test_mocks_fixture_is_not_verified_when_test_is_skipped(run_pytest):
+    result = run_pytest("""
+        import pytest
+        from funk import expects
+
+        def test_save(mocks):
+            storage = mocks.mock(name="storage")
+            expects(storage).save()
+            pytest.skip("not today")
+    """)
+    result.assert_outcomes(skipped=1)
+
+
+def test_mocks_fixture_is_not_verified_when_test_is_expected_to_fail(run_pytest):
+    result = run_pytest("""
+        import pytest
+        from funk import expects
+
+        @pytest.mark.xfail
+        def test_save(mocks):
+            storage = mocks.mock(name="storage")
+            expects(storage).save()
+            assert False
+    """)
+    result.assert_outcomes(xfailed=1)
@@ -0,0 +1,76 @@
+from precisely import assert_that, contains_exactly, equal_to, has_attrs
+
+import funk
+from funk import allows, allows_call, invocations, FunkyError, UnexpectedInvocationError
+from funk.recording import Recording
+from .util import assert_raises, assert_raises_str
+
+
+def test_invocations_are_not_recorded_by_default():
+    mocks = funk.Mocks()
+    storage = mocks.mock(name="storage")
+
+    assert_raises_str(FunkyError,
+        "Invocations are not being recorded: create Mocks with recording=funk.Recording()",
+        lambda: invocations(storage))
+
+def test_invocations_of_methods_and_mock_are_recorded_in_order():
+    mocks = funk.Mocks(recording=Recording())
+    storage = mocks.mock(name="storage")
+    allows(storage).save
+    allows_call(storage)
+
+    storage.save("a", key=1)
+    storage()
+
+    assert_that(invocations(storage), contains_exactly(
+        has_attrs(name="storage.save", args=("a", ), kwargs={"key": 1}),
+        has_attrs(name="storage", args=(), kwargs={}),
+    ))
+
+def test_unexpected_invocations_are_recorded():
+    mocks = funk.Mocks(recording=Recording())
+    storage = mocks.mock(name="storage")
+    allows(storage).save(1)
+
+    assert_raises(UnexpectedInvocationError, lambda: storage.save(2))
+
+    assert_that(list(map(str, invocations(storage))), equal_to(["storage.save(2)"]))
+
+def test_only_last_invocations_up_to_capacity_are_kept():
+    mocks = funk.Mocks(recording=Recording(capacity=3))
+    storage = mocks.mock(name="storage")
+    allows(storage).save
+
+    for index in range(0, 10):
+        storage.save(index)
+
+    assert_that(list(map(str, invocations(storage))), equal_to([
+        "storage.save(7)",
+        "storage.save(8)",
+        "storage.save(9)",
+    ]))
+
+def test_invocations_can_be_sampled():
+    mocks = funk.Mocks(recording=Recording(every=4))
+    storage = mocks.mock(name="storage")
+    allows(storage).save
+
+    for index in range(0, 10):
+        storage.save(index)
+
+    assert_that([invocation.args for invocation in invocations(storage)], equal_to([(0, ), (4, ), (8, )]))
+
+def test_fingerprints_are_recorded_instead_of_arguments_when_enabled():
+    mocks = funk.Mocks(recording=Recording(fingerprints=True))
+    storage = mocks.mock(name="storage")
+    allows(storage).save
+
+    storage.save("a", key=1)
+    storage.save("a", key=1)
+    storage.save(["a"])
+
+    first, second, third = invocations(storage)
+    assert_that(first, has_attrs(name="storage.save", args=None, kwargs=None))
+    assert_that(first.fingerprint, equal_to(second.fingerprint))
+    assert third.fingerprint != first.fingerprint
@@ -92,3 +92,31 @@ def test_assertion_error_is_raised_when_we_have_an_expected_call():
         str(error),
         equal_to('Invocation out of order. Expected no more calls in sequence, but got hand(in=hand).'),
     )
+
+def test_long_sequences_can_be_progressed_through():
+    class StubbedCall(object):
+        def __init__(self, name):
+            self._name = name
+            self._satisfied = False
+
+        def __str__(self):
+            return self._name
+
+        def is_satisfied(self):
+            return self._satisfied
+
+    calls = [StubbedCall("write({0})".format(index)) for index in range(0, 10000)]
+
+    sequence = Sequence()
+    for call in calls:
+        sequence.add_expected_call(call)
+
+    for call in calls:
+        sequence.add_actual_call(call)
+        call._satisfied = True
+
+    error = assert_raises(AssertionError, lambda: sequence.add_actual_call(calls[0]))
+    assert_that(
+        str(error),
+        equal_to("Invocation out of order. Expected no more calls in sequence, but got write(0)."),
+    )
@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+
+import pytest
+from precisely import assert_that, equal_to
+
+import funk
+from funk import expects, allows, FunkyError
+from funk.call import IntegerCallCount, InfiniteCallCount
+from funk.shared import SharedCounters
+from .util import assert_raises_str
+
+
+requires_fork = pytest.mark.skipif(
+    not hasattr(os, "fork"),
+    reason="fork is not supported on this platform",
+)
+
+
+def test_shared_call_count_can_be_claimed_until_none_remaining():
+    call_count = SharedCounters().share(IntegerCallCount(2))
+    assert not call_count.is_satisfied()
+    assert call_count.claim()
+    assert call_count.claim()
+    assert not call_count.claim()
+    assert call_count.none_remaining()
+    assert call_count.is_satisfied()
+
+def test_call_counts_without_state_are_not_shared():
+    call_count = InfiniteCallCount()
+    assert SharedCounters().share(call_count) is call_count
+
+def test_counters_are_allocated_across_many_chunks():
+    counters = SharedCounters()
+    allocated = [counters.allocate(index) for index in range(0, 10000)]
+    assert_that([counter.get() for counter in allocated], equal_to(list(range(0, 10000))))
+
+@requires_fork
+def test_calls_in_forked_processes_count_towards_expectations():
+    mocks = funk.Mocks(fork_safe=True)
+    storage = mocks.mock(name="storage")
+    for index in range(0, 4):
+        expects(storage).save(index)
+    allows(storage).load
+
+    _run_in_forked_processes([lambda index=index: storage.save(index) for index in range(0, 4)])
+
+    mocks.verify()
+
+@requires_fork
+def test_unsatisfied_expectations_are_reported_after_calls_in_forked_processes():
+    mocks = funk.Mocks(fork_safe=True)
+    storage = mocks.mock(name="storage")
+    expects(storage).save(1)
+    expects(storage).save(2)
+
+    _run_in_forked_processes([lambda: storage.save(1)])
+
+    assert_raises_str(AssertionError,
+                      "Not all expectations were satisfied. Expected call: storage.save(2)",
+                      mocks.verify)
+
+@requires_fork
+def test_sequence_progress_is_shared_with_forked_processes():
+    mocks = funk.Mocks(fork_safe=True)
+    log = mocks.mock(name="log")
+    ordering = mocks.sequence()
+    allows(log).write.in_sequence(ordering)
+    expects(log).close().in_sequence(ordering)
+
+    _run_in_forked_processes([lambda: log.close()])
+
+    assert_raises_str(AssertionError,
+                      "Invocation out of order. Expected no more calls in sequence, but got log.write.",
+                      lambda: log.write("a"))
+
+def _run_in_forked_processes(functions):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=function) for function in functions]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert_that(process.exitcode, equal_to(0))
+
+def test_returns_from_cannot_be_used_with_fork_safe_mocks():
+    mocks = funk.Mocks(fork_safe=True)
+    storage = mocks.mock(name="storage")
+
+    assert_raises_str(FunkyError,
+        "Cannot return values from an iterable on mocks of fork-safe Mocks",
+        lambda: expects(storage).next_page.returns_from([1, 2]))
+    assert_raises_str(FunkyError,
+        "Cannot return values from an iterable on mocks of fork-safe Mocks",
+        lambda: allows(storage).next_page.returns_from([1, 2]))
@@ -0,0 +1,73 @@
+import gc
+import weakref
+
+from precisely import assert_that, equal_to
+
+from funk.spec import spec_for
+
+
+def test_spec_is_shared_between_lookups_of_same_type():
+    class Database(object):
+        pass
+
+    assert spec_for(Database) is spec_for(Database)
+
+def test_spec_describes_attributes_and_whether_they_are_callable():
+    class Database(object):
+        def save(self):
+            pass
+
+        status = False
+
+    spec = spec_for(Database)
+    assert_that(spec.has_attribute("save"), equal_to(True))
+    assert_that(spec.is_callable("save"), equal_to(True))
+    assert_that(spec.has_attribute("status"), equal_to(True))
+    assert_that(spec.is_callable("status"), equal_to(False))
+    assert_that(spec.has_attribute("delete"), equal_to(False))
+    assert_that(spec.is_callable("delete"), equal_to(False))
+
+def test_each_attribute_is_looked_up_on_type_once():
+    lookups = []
+
+    class Meta(type):
+        def __getattribute__(cls, name):
+            lookups.append(name)
+            return type.__getattribute__(cls, name)
+
+    class Database(object, metaclass=Meta):
+        def save(self):
+            pass
+
+    spec = spec_for(Database)
+    del lookups[:]
+    for index in range(0, 10):
+        spec.has_attribute("save")
+        spec.is_callable("save")
+
+    assert_that(lookups, equal_to(["save", "save"]))
+
+def test_spec_does_not_keep_type_alive():
+    class Database(object):
+        pass
+
+    spec_for(Database).has_attribute("save")
+    database_ref = weakref.ref(Database)
+    del Database
+    gc.collect()
+
+    assert database_ref() is None
+
+def test_spec_describes_whether_attributes_are_coroutine_functions():
+    class Database(object):
+        async def fetch(self):
+            pass
+
+        def save(self):
+            pass
+
+    spec = spec_for(Database)
+    assert_that(spec.is_coroutine_function("fetch"), equal_to(True))
+    assert_that(spec.is_callable("fetch"), equal_to(True))
+    assert_that(spec.is_coroutine_function("save"), equal_to(False))
+    assert_that(spec.is_coroutine_function("delete"), equal_to(False))
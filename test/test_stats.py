@@ -0,0 +1,80 @@
+from precisely import assert_that, equal_to, greater_than, has_attrs, contains_exactly, contains_string
+
+import funk
+from funk import allows, allows_call, UnexpectedInvocationError
+from funk.stats import Stats
+from .util import assert_raises
+
+
+def test_stats_are_not_collected_by_default():
+    mocks = funk.Mocks()
+    assert mocks.stats is None
+
+def test_invocations_are_counted_per_mock_and_method():
+    mocks = funk.Mocks(stats=True)
+    storage = mocks.mock(name="storage")
+    allows(storage).save
+    allows(storage).load
+    allows_call(storage)
+
+    storage.save()
+    storage.save()
+    storage.load()
+    storage()
+    mocks.verify()
+
+    assert_that(mocks.stats.for_method("storage", "save").invocations, equal_to(2))
+    assert_that(mocks.stats.for_method("storage", "load").invocations, equal_to(1))
+    assert_that(mocks.stats.for_method("storage", None).invocations, equal_to(1))
+    assert_that(mocks.stats.invocations, equal_to(4))
+
+def test_expectations_scanned_per_invocation_are_recorded():
+    mocks = funk.Mocks(stats=True)
+    storage = mocks.mock(name="storage")
+    allows(storage).save(greater_than(5))
+    allows(storage).save(1)
+
+    storage.save(1)
+    storage.save(6)
+
+    assert_that(mocks.stats.for_method("storage", "save"), has_attrs(
+        invocations=2,
+        expectations_scanned=3,
+        max_expectations_scanned=2,
+    ))
+
+def test_time_in_matchers_and_actions_is_recorded():
+    mocks = funk.Mocks(stats=True)
+    storage = mocks.mock(name="storage")
+    allows(storage).save(1)
+
+    storage.save(1)
+
+    assert_that(mocks.stats.matcher_time, greater_than(0))
+    assert_that(mocks.stats.action_time, greater_than(0))
+
+def test_mismatch_descriptions_built_for_unexpected_invocations_are_counted():
+    mocks = funk.Mocks(stats=True)
+    storage = mocks.mock(name="storage")
+    allows(storage).save(1)
+    allows(storage).save(2)
+
+    assert_raises(UnexpectedInvocationError, lambda: storage.save(3))
+
+    assert_that(mocks.stats.for_method("storage", "save"), has_attrs(
+        invocations=1,
+        unexpected_invocations=1,
+        mismatch_descriptions=2,
+    ))
+
+def test_report_lists_methods_by_number_of_invocations():
+    stats = Stats()
+    stats.for_method("storage", "save").record_dispatch(1)
+    stats.for_method("storage", "load").record_dispatch(1)
+    stats.for_method("storage", "load").record_dispatch(1)
+
+    lines = stats.report().split("\n")
+    assert_that(lines[1:], contains_exactly(
+        contains_string("storage.load"),
+        contains_string("storage.save"),
+    ))
@@ -1,6 +1,8 @@
 from precisely import assert_that, any_of, equal_to
 
-from funk.tools import data
+import pickle
+
+from funk.tools import data, data_view, Data
 
 def test_value_object_sets_attributes_to_passed_keyword_arguments():
     obj = data(width=20, height=40)
@@ -22,3 +24,78 @@ def test_value_object_str_shows_updated_attributes():
 def test_value_object_repr_is_same_as_str():
     obj = data(width=20)
     assert_that(repr(obj), equal_to("Data(width=20)"))
+
+def test_value_objects_with_same_attributes_are_equal():
+    assert_that(data(width=20, height=40), equal_to(data(width=20, height=40)))
+    assert_that(data(width=20, height=40), equal_to(data(height=40, width=20)))
+    assert data(width=20) != data(width=30)
+    assert data(width=20) != data(height=20)
+    assert data(width=20) != {"width": 20}
+
+def test_value_objects_are_hashed_by_identity():
+    obj = data(names=["a", "b"])
+    obj_hash = hash(obj)
+
+    obj.names.append("c")
+    obj.names = ["d"]
+
+    assert_that(hash(obj), equal_to(obj_hash))
+    assert_that({obj: 1}[obj], equal_to(1))
+
+def test_value_objects_with_same_keys_share_class():
+    assert type(data(width=20)) is type(data(width=30))
+    assert isinstance(data(width=20), Data)
+
+def test_value_objects_store_attributes_in_slots():
+    obj = data(width=20)
+    obj.width = 30
+
+    assert_that(vars(obj), equal_to({}))
+
+def test_value_objects_can_have_attributes_added():
+    obj = data(width=20)
+    obj.height = 40
+
+    assert_that(obj.height, equal_to(40))
+    assert_that(obj, equal_to(data(width=20)))
+    assert_that(str(obj), equal_to("Data(width=20)"))
+
+def test_value_object_with_attributes_that_are_not_identifiers_does_not_share_mapping():
+    attributes = {"max width": 1}
+    obj = Data(attributes)
+    obj.foo = 2
+
+    assert_that(attributes, equal_to({"max width": 1}))
+
+def test_value_object_can_have_attributes_that_are_not_identifiers():
+    obj = data(**{"class": "wide", "max width": 20})
+    assert_that(getattr(obj, "class"), equal_to("wide"))
+    assert_that(str(obj), equal_to("Data(class='wide', max width=20)"))
+
+def test_value_object_can_be_created_from_mapping():
+    assert_that(Data({"width": 20}), equal_to(data(width=20)))
+
+def test_value_object_can_be_pickled():
+    obj = data(width=20)
+    assert_that(pickle.loads(pickle.dumps(obj)), equal_to(obj))
+
+def test_data_view_reads_attributes_from_mapping():
+    attributes = {"width": 20}
+    obj = data_view(attributes)
+    attributes["height"] = 40
+    assert_that(obj.width, equal_to(20))
+    assert_that(obj.height, equal_to(40))
+    assert_that(str(obj), equal_to("Data(width=20, height=40)"))
+
+def test_data_view_writes_attributes_to_mapping():
+    attributes = {"width": 20}
+    obj = data_view(attributes)
+    obj.width = 30
+    assert_that(attributes, equal_to({"width": 30}))
+
+def test_data_view_raises_attribute_error_for_missing_keys():
+    obj = data_view({})
+    assert not hasattr(obj, "width")
+
+def test_data_view_is_equal_to_value_object_with_same_attributes():
+    assert_that(data_view({"width": 20}), equal_to(data(width=20)))
@@ -4,6 +4,8 @@ from funk.util import arguments_str
 from funk.util import function_call_str
 from funk.util import method_call_str
 from funk.util import function_call_str_multiple_lines
+from funk.util import bounded_repr
+from funk.util import truncate
 
 def test_arguments_str_shows_positional_and_keyword_arguments():
     result = arguments_str((1, "two"), {'foo': 'bar', 'key': 'word'})
@@ -24,3 +26,28 @@ def test_function_call_str_multiple_lines_displays_arguments_on_separate_lines()
     result = function_call_str_multiple_lines("save", (1, "two"), {'foo': 'bar', 'key': 'word'})
 
     assert_that(result, equal_to('save(1,\n     two,\n     foo=bar,\n     key=word)'))
+
+def test_truncate_leaves_text_within_limit_unchanged():
+    assert_that(truncate("abc", 3), equal_to("abc"))
+    assert_that(truncate("abc", None), equal_to("abc"))
+
+def test_truncate_cuts_text_over_limit():
+    assert_that(truncate("abcdef", 3), equal_to("abc..."))
+
+def test_bounded_repr_is_repr_when_there_is_no_limit():
+    value = {"a": [1, (2, )], "b": b"\x00"}
+
+    assert_that(bounded_repr(value), equal_to(repr(value)))
+
+def test_bounded_repr_is_repr_when_repr_is_within_limit():
+    for value in ["abc", b"abc", [1, 2], (1, ), {"a": 1}, 42]:
+        assert_that(bounded_repr(value, 20), equal_to(repr(value)))
+
+def test_bounded_repr_truncates_long_strings_and_bytes():
+    assert_that(bounded_repr("a" * 1000, 8), equal_to("'aaaaaaa..."))
+    assert_that(bounded_repr(b"a" * 1000, 8), equal_to("b'aaaaaa..."))
+
+def test_bounded_repr_truncates_long_containers():
+    assert_that(bounded_repr(list(range(1000)), 10), equal_to("[0, 1, 2, ..."))
+    assert_that(bounded_repr({"a": "b" * 1000}, 10), equal_to("{'a': 'bbb..."))
+    assert_that(bounded_repr([["a" * 1000]], 10), equal_to("[['aaaaaaa..."))